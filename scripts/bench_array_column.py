@@ -0,0 +1,47 @@
+# Benchmark writing and reading coordinates with the raw ArrayType column
+# against PickleType.
+# Usage: python bench_array_column.py [number of rows] [number of atoms]
+
+from viewland.storage.types import ArrayType
+
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer
+from sqlalchemy import PickleType, select
+import numpy as np
+import sys
+import time
+
+
+def bench(column_type, coords):
+    """Return the time to bulk write and read all coords."""
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table(
+        "tbl_coords",
+        metadata,
+        Column("_id", Integer, primary_key=True),
+        Column("coords", column_type),
+    )
+    metadata.create_all(engine)
+
+    t0 = time.perf_counter()
+    engine.execute(table.insert(), [dict(coords=x) for x in coords])
+    t1 = time.perf_counter()
+    rows = engine.execute(select([table.c.coords])).fetchall()
+    t2 = time.perf_counter()
+    assert len(rows) == len(coords)
+    return t1 - t0, t2 - t1
+
+
+def main(nrows, natoms):
+    coords = list(np.random.default_rng(0).random((nrows, 3 * natoms)))
+    print("rows:", nrows, "atoms:", natoms)
+    column_types = [("PickleType", PickleType), ("ArrayType", ArrayType)]
+    for name, column_type in column_types:
+        write, read = bench(column_type, coords)
+        print("%-10s write: %.3f s  read: %.3f s" % (name, write, read))
+
+
+if __name__ == "__main__":
+    nrows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    natoms = int(sys.argv[2]) if len(sys.argv) > 2 else 38
+    main(nrows, natoms)
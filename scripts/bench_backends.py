@@ -0,0 +1,96 @@
+# Benchmark importing min.data and ts.data and building the graph with
+# database2graph on PostgreSQL, a SQLite file and an in-memory SQLite
+# database. PostgreSQL is only included if the POSTGRES_* environment
+# variables are set.
+# Usage: python bench_backends.py [number of minima] [transition states]
+
+from viewland.storage import Database
+from viewland.storage.database import (
+    create_connect_string,
+    create_sqlite_connect_string,
+)
+from viewland.utils import Converter, database2graph
+
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+
+def write_data(tmpdir, nmin, nts):
+    """Write synthetic min.data and ts.data files."""
+    rng = np.random.default_rng(0)
+    mindata = os.path.join(tmpdir, "min.data")
+    np.savetxt(
+        mindata,
+        np.column_stack(
+            [
+                rng.normal(0.0, 10.0, nmin),
+                rng.normal(50.0, 1.0, nmin),
+                np.ones(nmin),
+                np.ones((nmin, 3)),
+            ]
+        ),
+        fmt="%25.15f %25.15f %9d %19.10f %19.10f %19.10f",
+    )
+    tsdata = os.path.join(tmpdir, "ts.data")
+    np.savetxt(
+        tsdata,
+        np.column_stack(
+            [
+                rng.normal(100.0, 10.0, nts),
+                rng.normal(50.0, 1.0, nts),
+                np.ones(nts),
+                rng.integers(1, nmin + 1, nts),
+                rng.integers(1, nmin + 1, nts),
+                np.ones((nts, 3)),
+            ]
+        ),
+        fmt="%25.15f %25.15f %9d %9d %9d %19.10f %19.10f %19.10f",
+    )
+    return mindata, tsdata
+
+
+def bench(connect_string, mindata, tsdata):
+    """Return the time to import the files and to build the graph."""
+    db = Database(connect_string, landscape="bench")
+    t0 = time.perf_counter()
+    Converter(db, mindata, tsdata).convert_no_coords()
+    t1 = time.perf_counter()
+    graph = database2graph(db, records=True)
+    t2 = time.perf_counter()
+    assert graph.number_of_nodes() == db.number_of_minima()
+    db.reset()
+    db.close()
+    return t1 - t0, t2 - t1
+
+
+def main(nmin, nts):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mindata, tsdata = write_data(tmpdir, nmin, nts)
+        backends = [
+            (
+                "SQLite file",
+                create_sqlite_connect_string(
+                    os.path.join(tmpdir, "landscape.db")
+                ),
+            ),
+            ("SQLite memory", create_sqlite_connect_string()),
+        ]
+        if os.environ.get("POSTGRES_HOST"):
+            backends.insert(0, ("PostgreSQL", create_connect_string()))
+
+        print("minima:", nmin, "transition states:", nts)
+        for name, connect_string in backends:
+            ingest, graph = bench(connect_string, mindata, tsdata)
+            print(
+                "%-14s ingest: %.3f s  database2graph: %.3f s"
+                % (name, ingest, graph)
+            )
+
+
+if __name__ == "__main__":
+    nmin = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    nts = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    main(nmin, nts)
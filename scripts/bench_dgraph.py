@@ -0,0 +1,57 @@
+# Benchmark DisconnectivityGraph.calculate with the networkx and the arrays
+# graph backends on synthetic landscapes with 1e4, 1e5 and 1e6 minima.
+# Usage: python bench_dgraph.py [numbers of minima ...]
+
+from viewland.utils import DisconnectivityGraph, LandscapeGraph
+
+import numpy as np
+import sys
+import time
+
+# Number of transition states per minimum.
+TS_PER_MINIMUM = 3
+
+
+def make_landscape(nmin):
+    """Return a random LandscapeGraph with nmin minima."""
+    rng = np.random.default_rng(0)
+    nts = TS_PER_MINIMUM * nmin
+    minima = dict(
+        id=np.arange(1, nmin + 1),
+        energy=rng.normal(0.0, 10.0, nmin),
+        fvib=np.ones(nmin),
+        pgorder=np.ones(nmin, dtype=int),
+    )
+    transition_states = dict(
+        id=np.arange(1, nts + 1),
+        energy=rng.normal(100.0, 10.0, nts),
+        fvib=np.ones(nts),
+        pgorder=np.ones(nts, dtype=int),
+        min1=rng.integers(1, nmin + 1, nts),
+        min2=rng.integers(1, nmin + 1, nts),
+    )
+    return LandscapeGraph.from_arrays(minima, transition_states)
+
+
+def bench(landscape, backend):
+    """Return the time to set up and calculate the disconnectivity graph."""
+    t0 = time.perf_counter()
+    dg = DisconnectivityGraph(landscape, nlevels=20, backend=backend)
+    dg.calculate()
+    return time.perf_counter() - t0
+
+
+def main(sizes):
+    print("%-12s %14s %14s" % ("minima", "networkx (s)", "arrays (s)"))
+    for nmin in sizes:
+        landscape = make_landscape(nmin)
+        times = [bench(landscape, b) for b in ["networkx", "arrays"]]
+        print("%-12d %14.3f %14.3f" % (nmin, times[0], times[1]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sizes = [int(float(n)) for n in sys.argv[1:]]
+    else:
+        sizes = [10000, 100000, 1000000]
+    main(sizes)
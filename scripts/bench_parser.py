@@ -0,0 +1,77 @@
+# Benchmark the columnar ts.data parser against the line-by-line loop that
+# Converter used before, and the parallel parser against the serial one.
+# Usage: python bench_parser.py [number of transition states] [processes]
+
+from viewland.utils.pathsample import read_ts_data
+
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+
+def write_ts_data(path, nts, nmin):
+    """Write a synthetic ts.data file with nts transition states."""
+    rng = np.random.default_rng(0)
+    data = np.column_stack(
+        [
+            rng.normal(100.0, 10.0, nts),
+            rng.normal(50.0, 1.0, nts),
+            np.ones(nts),
+            rng.integers(1, nmin + 1, nts),
+            rng.integers(1, nmin + 1, nts),
+            np.ones((nts, 3)),
+        ]
+    )
+    fmt = "%25.15f %25.15f %9d %9d %9d %19.10f %19.10f %19.10f"
+    np.savetxt(path, data, fmt=fmt)
+
+
+def read_ts_data_loop(path):
+    """The former per-line parser of Converter.read_ts_data."""
+    ts_dicts = []
+    for line in open(path, "r"):
+        sline = line.split()
+        e, fvib = list(map(float, sline[:2]))
+        pg = int(sline[2])
+        m1indx, m2indx = list(map(int, sline[3:5]))
+        ts_dicts.append(
+            dict(
+                energy=e,
+                fvib=fvib,
+                pgorder=pg,
+                _minimum1_id=m1indx,
+                _minimum2_id=m2indx,
+            )
+        )
+    return ts_dicts
+
+
+def main(nts, nprocs):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "ts.data")
+        write_ts_data(path, nts, max(nts // 10, 2))
+
+        t0 = time.perf_counter()
+        loop = read_ts_data_loop(path)
+        t1 = time.perf_counter()
+        arrays = read_ts_data(path)
+        t2 = time.perf_counter()
+        parallel = read_ts_data(path, nprocs=nprocs)
+        t3 = time.perf_counter()
+
+    assert len(loop) == len(arrays) == nts
+    assert (parallel == arrays).all()
+    print("transition states:", nts)
+    print("line-by-line loop: %.3f s" % (t1 - t0))
+    print("columnar parser:   %.3f s" % (t2 - t1))
+    print("speedup:           %.1fx" % ((t1 - t0) / (t2 - t1)))
+    print("parallel parser (%d processes): %.3f s" % (nprocs, t3 - t2))
+    print("parallel speedup:  %.1fx" % ((t2 - t1) / (t3 - t2)))
+
+
+if __name__ == "__main__":
+    nts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    nprocs = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    main(nts, nprocs)
@@ -0,0 +1,148 @@
+# Benchmark the latency of the Database queries with and without the
+# indexes on minima and transition states, on a synthetic landscape.
+# The database is PostgreSQL if the POSTGRES_* environment variables are
+# set, otherwise a SQLite file.
+# Usage: python bench_queries.py [number of transition states] [minima]
+
+from viewland.storage import Database, Minimum, TransitionState
+from viewland.storage.bulk import bulk_insert, deferred_indexes, analyze
+from viewland.storage.database import (
+    create_connect_string,
+    create_sqlite_connect_string,
+)
+from viewland.storage.functions import least, greatest
+from viewland.utils import database2graph
+
+from sqlalchemy import or_, text
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+# Number of times each query is repeated.
+REPEAT = 20
+
+
+def fill(db, nmin, nts):
+    """Bulk load a random landscape into db."""
+    rng = np.random.default_rng(0)
+    bulk_insert(
+        db.engine,
+        Minimum.__table__,
+        dict(
+            landscape_id=np.full(nmin, db.landscape_id),
+            _id=np.arange(1, nmin + 1),
+            energy=rng.normal(0.0, 10.0, nmin),
+            fvib=np.ones(nmin),
+            pgorder=np.ones(nmin, dtype=int),
+            invalid=np.zeros(nmin, dtype=int),
+        ),
+    )
+    bulk_insert(
+        db.engine,
+        TransitionState.__table__,
+        dict(
+            landscape_id=np.full(nts, db.landscape_id),
+            _id=np.arange(1, nts + 1),
+            energy=rng.normal(100.0, 10.0, nts),
+            fvib=np.ones(nts),
+            pgorder=np.ones(nts, dtype=int),
+            invalid=np.zeros(nts, dtype=int),
+            _minimum1_id=rng.integers(1, nmin + 1, nts),
+            _minimum2_id=rng.integers(1, nmin + 1, nts),
+        ),
+    )
+    analyze(db.engine, [Minimum.__table__, TransitionState.__table__])
+
+
+def timed(function):
+    """Return the mean time of a call to function in milliseconds."""
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - t0) / REPEAT * 1000
+
+
+def bench(db):
+    """Return the latencies of the queries on db."""
+    rng = np.random.default_rng(1)
+    nmin = db.number_of_minima()
+    minima = [
+        db.get_minimum_from_id(int(i)) for i in rng.integers(1, nmin, 2)
+    ]
+    ts = db.get_transition_state_from_id(1)
+    pair = (ts.minimum2, ts.minimum1)
+    latencies = [
+        ("get_lowest_energy_minimum", timed(db.get_lowest_energy_minimum)),
+        (
+            "get_transition_states_connected_to_minimum",
+            timed(
+                lambda: db.get_transition_states_connected_to_minimum(
+                    minima[0]
+                )
+            ),
+        ),
+        (
+            "get_transition_state_between_minima",
+            timed(lambda: db.get_transition_state_between_minima(*pair)),
+        ),
+    ]
+    db.session.expunge_all()
+    t0 = time.perf_counter()
+    database2graph(db, records=True)
+    latencies.append(("database2graph", (time.perf_counter() - t0) * 1000))
+    return latencies
+
+
+def explain(db):
+    """Print the query plans of the lookups of transition states."""
+    T = TransitionState
+    queries = [
+        db.query(T).filter(or_(T._minimum1_id == 1, T._minimum2_id == 1)),
+        db.query(T).filter(
+            least(T._minimum1_id, T._minimum2_id) == 1,
+            greatest(T._minimum1_id, T._minimum2_id) == 2,
+        ),
+    ]
+    prefix = "EXPLAIN QUERY PLAN" if db.engine.name == "sqlite" else "EXPLAIN"
+    for query in queries:
+        statement = query.statement.compile(
+            db.engine, compile_kwargs=dict(literal_binds=True)
+        )
+        for row in db.engine.execute(text("{} {}".format(prefix, statement))):
+            print("    ", row[-1])
+
+
+def main(nts, nmin):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if os.environ.get("POSTGRES_HOST"):
+            connect_string = create_connect_string()
+        else:
+            connect_string = create_sqlite_connect_string(
+                os.path.join(tmpdir, "landscape.db")
+            )
+        db = Database(connect_string, landscape="bench", reset=True)
+        fill(db, nmin, nts)
+        print("minima:", nmin, "transition states:", nts)
+
+        print("query plan with indexes:")
+        explain(db)
+        indexed = bench(db)
+        tables = [Minimum.__table__, TransitionState.__table__]
+        with deferred_indexes(db.engine, tables):
+            print("query plan without indexes:")
+            explain(db)
+            scanned = bench(db)
+
+        print("%-44s %12s %12s" % ("query (ms)", "indexed", "no index"))
+        for (name, t1), (_, t2) in zip(indexed, scanned):
+            print("%-44s %12.3f %12.3f" % (name, t1, t2))
+        db.reset()
+        db.close()
+
+
+if __name__ == "__main__":
+    nts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    nmin = int(sys.argv[2]) if len(sys.argv) > 2 else nts // 10
+    main(nts, nmin)
@@ -29,12 +29,16 @@ def main():
         print(err)
         exit(1)
 
-    # Create the database.
-    db = Database(create_connect_string())
+    # Connect to the database, keeping the data of the previous run.
+    db = Database(create_connect_string(), reset=False)
 
-    # Read in data from min.data ts.data.
+    # Read in data from min.data ts.data, unless they are unchanged since
+    # the previous run.
     converter = Converter(db)
-    converter.convert_no_coords()
+    if converter.is_up_to_date():
+        print("min.data and ts.data are unchanged, reusing the database")
+    else:
+        converter.convert_no_coords()
 
     # Define the colorbar range.
     # color_range will be scaled to [0,1] by cm.ScalarMappable.
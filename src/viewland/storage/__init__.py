@@ -1 +1,4 @@
-from .database import *
\ No newline at end of file
+from .cache import *
+from .database import *
+from .records import *
+from .snapshot import *
@@ -0,0 +1,280 @@
+""" Asyncio access to the database for asynchronous web views and tasks."""
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .database import Database, Minimum, TransitionState
+from .engine import get_async_engine
+
+__all__ = ["AsyncDatabase"]
+
+
+class _SessionDatabase(Database):
+    """
+    A Database on the synchronous session of an AsyncSession.
+
+    It only exists inside AsyncSession.run_sync, where the blocking calls
+    of Database are run as coroutines of the async driver.
+    """
+
+    def __init__(self, session, landscape, landscape_id=None, reset=False):
+        self.session = session
+        self.engine = session.bind
+        if landscape_id is None:
+            self._open(landscape, reset)
+        else:
+            self.landscape = landscape
+            self.landscape_id = landscape_id
+
+
+class AsyncDatabase(object):
+    """
+    Asyncio version of Database, built on the async engine of sqlalchemy
+    with the asyncpg (PostgreSQL) or aiosqlite (SQLite) driver.
+
+    The methods mirror the query API of Database, but are coroutines. An
+    AsyncDatabase is created with the coroutine AsyncDatabase.open .
+
+    Parameters
+    ----------
+    engine : sqlalchemy.ext.asyncio.AsyncEngine
+    landscape : str
+        Name of the landscape.
+    landscape_id : int
+        The id of the landscape.
+
+    Attributes
+    ----------
+    engine : sqlalchemy.ext.asyncio.AsyncEngine
+    session : sqlalchemy.ext.asyncio.AsyncSession
+    landscape : str
+    landscape_id : int
+
+    Notes
+    -----
+    Attributes of the returned objects which are not loaded yet, e.g. the
+    relationships minimum1 and minimum2 of a TransitionState, can not be
+    loaded implicitly in asyncio. Use the ids _minimum1_id and _minimum2_id
+    or the array queries instead, or run a function with run_sync.
+
+    Examples
+    --------
+    >>> from viewland.storage.asyncdb import AsyncDatabase
+    >>> from viewland.storage.database import create_connect_string
+
+    >>> async def lowest_energy():
+    ...     db = await AsyncDatabase.open(create_connect_string())
+    ...     minimum = await db.get_lowest_energy_minimum()
+    ...     await db.close()
+    ...     return minimum.energy
+
+    See Also
+    --------
+    Database
+    """
+
+    engine = None
+    session = None
+
+    def __init__(self, engine, landscape, landscape_id):
+        self.engine = engine
+        self.session = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )()
+        self.landscape = landscape
+        self.landscape_id = landscape_id
+
+    @classmethod
+    async def open(cls, connect_string, reset=False, landscape="default"):
+        """
+        Open a landscape, see Database.
+
+        Parameters
+        ----------
+        connect_string : str
+            Connection string for sqlalchemy, e.g. from
+            create_connect_string. The driver is replaced by its async
+            counterpart, see engine.get_async_engine .
+        reset : boolean, optional
+            Remove the data of the landscape, default is false.
+        landscape : str, optional
+            Name of the landscape, it is created if it does not exist.
+
+        Returns
+        -------
+        db : AsyncDatabase
+        """
+        engine = get_async_engine(connect_string)
+        db = cls(engine, landscape, None)
+        db.landscape_id = await db.session.run_sync(
+            lambda session: _SessionDatabase(
+                session, landscape, reset=reset
+            ).landscape_id
+        )
+        return db
+
+    async def run_sync(self, function, *args, **kwargs):
+        """
+        Run function(db, *args, **kwargs) with a synchronous Database db on
+        the session of this AsyncDatabase and return its result.
+        """
+
+        def call(session):
+            db = _SessionDatabase(session, self.landscape, self.landscape_id)
+            return function(db, *args, **kwargs)
+
+        return await self.session.run_sync(call)
+
+    async def close(self):
+        """
+        Close the session, its connection is returned to the pool of the
+        shared engine.
+        """
+        await self.session.commit()
+        await self.session.close()
+
+    async def reset(self):
+        """See Database.reset ."""
+        return await self.run_sync(Database.reset)
+
+    async def landscapes(self):
+        """See Database.landscapes ."""
+        return await self.run_sync(Database.landscapes)
+
+    async def get_lowest_energy_minimum(self):
+        """See Database.get_lowest_energy_minimum ."""
+        return await self.run_sync(Database.get_lowest_energy_minimum)
+
+    async def get_minimum_from_id(self, id):
+        """See Database.get_minimum_from_id ."""
+        return await self.run_sync(Database.get_minimum_from_id, id)
+
+    async def get_transition_state_from_id(self, id):
+        """See Database.get_transition_state_from_id ."""
+        return await self.run_sync(Database.get_transition_state_from_id, id)
+
+    async def get_transition_state_between_minima(self, min1, min2):
+        """See Database.get_transition_state_between_minima ."""
+        return await self.run_sync(
+            Database.get_transition_state_between_minima, min1, min2
+        )
+
+    async def get_transition_states_connected_to_minimum(self, min1):
+        """See Database.get_transition_states_connected_to_minimum ."""
+        return await self.run_sync(
+            Database.get_transition_states_connected_to_minimum, min1
+        )
+
+    async def get_minima_by_ids(self, ids):
+        """See Database.get_minima_by_ids ."""
+        return await self.run_sync(Database.get_minima_by_ids, ids)
+
+    async def get_transition_states_for_minima(self, ids):
+        """See Database.get_transition_states_for_minima ."""
+        return await self.run_sync(
+            Database.get_transition_states_for_minima, ids
+        )
+
+    async def get_transition_states_between_pairs(self, pairs):
+        """See Database.get_transition_states_between_pairs ."""
+        return await self.run_sync(
+            Database.get_transition_states_between_pairs, pairs
+        )
+
+    async def minima(self, order_energy=True):
+        """See Database.minima ."""
+        return await self.run_sync(Database.minima, order_energy)
+
+    async def transition_states(self, order_energy=False):
+        """See Database.transition_states ."""
+        return await self.run_sync(Database.transition_states, order_energy)
+
+    async def minima_arrays(self, emax=None, order_energy=False):
+        """See Database.minima_arrays ."""
+        return await self.run_sync(
+            Database.minima_arrays, emax=emax, order_energy=order_energy
+        )
+
+    async def transition_state_arrays(self, emax=None, order_energy=False):
+        """See Database.transition_state_arrays ."""
+        return await self.run_sync(
+            Database.transition_state_arrays,
+            emax=emax,
+            order_energy=order_energy,
+        )
+
+    async def get_statistics(self):
+        """See Database.get_statistics ."""
+        return await self.run_sync(Database.get_statistics)
+
+    async def number_of_minima(self):
+        """See Database.number_of_minima ."""
+        return await self.run_sync(Database.number_of_minima)
+
+    async def number_of_transition_states(self):
+        """See Database.number_of_transition_states ."""
+        return await self.run_sync(Database.number_of_transition_states)
+
+    async def _stream(self, entity, order_energy, batch_size):
+        """Yield the objects of entity from a server-side cursor."""
+        statement = select(entity).where(
+            entity.landscape_id == self.landscape_id
+        )
+        if order_energy:
+            statement = statement.order_by(entity.energy)
+        result = await self.session.stream(
+            statement.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.scalars().partitions(batch_size):
+            for obj in partition:
+                yield obj
+
+    def iter_minima(self, order_energy=True, batch_size=10000):
+        """
+        Iterate asynchronously over all minima, see Database.iter_minima .
+
+        >>> async for minimum in db.iter_minima():
+        ...     print(minimum.energy)
+        """
+        return self._stream(Minimum, order_energy, batch_size)
+
+    def iter_transition_states(self, order_energy=False, batch_size=10000):
+        """
+        Iterate asynchronously over all transition states, see
+        Database.iter_transition_states .
+        """
+        return self._stream(TransitionState, order_energy, batch_size)
+
+    async def bulk_insert(self, table, columns):
+        """
+        Insert columnar data into a table, see bulk.bulk_insert .
+
+        On PostgreSQL the rows are sent with the binary COPY protocol of
+        asyncpg, otherwise with an executemany INSERT. The data version of
+        the landscape is bumped afterwards.
+
+        Returns
+        -------
+        nrows : int
+            The number of inserted rows.
+        """
+        nrows = len(next(iter(columns.values()))) if columns else 0
+        if nrows == 0:
+            return 0
+        names = list(columns.keys())
+        lists = [np.asarray(c).tolist() for c in columns.values()]
+        async with self.engine.begin() as connection:
+            if self.engine.dialect.name == "postgresql":
+                raw = await connection.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    table.name, records=list(zip(*lists)), columns=names
+                )
+            else:
+                await connection.execute(
+                    table.insert(),
+                    [dict(zip(names, row)) for row in zip(*lists)],
+                )
+        await self.run_sync(Database.bump_version)
+        return nrows
@@ -0,0 +1,176 @@
+""" Bulk loading of columnar data into the database tables."""
+
+from contextlib import contextmanager
+import io
+import re
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+__all__ = ["bulk_insert", "deferred_indexes", "create_indexes", "analyze"]
+
+# Number of rows formatted at once when streaming data to COPY.
+COPY_CHUNK_SIZE = 65536
+
+
+class _IteratorFile(io.TextIOBase):
+    """
+    A read-only file object over an iterator of strings.
+
+    psycopg2's copy_expert pulls data with read(size), so the rows can be
+    formatted lazily instead of building the whole COPY payload in memory.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        # the position of the first unread character of self._buffer, the
+        # buffer is not sliced on every read since it holds a whole chunk
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = float("inf")
+        parts = []
+        while size > 0:
+            if self._offset == len(self._buffer):
+                try:
+                    self._buffer = next(self._chunks)
+                except StopIteration:
+                    break
+                self._offset = 0
+                continue
+            end = min(len(self._buffer), self._offset + size)
+            parts.append(self._buffer[self._offset : end])
+            size -= end - self._offset
+            self._offset = end
+        return "".join(parts)
+
+
+def _copy_chunks(columns, nrows):
+    """Yield the rows in PostgreSQL COPY text format."""
+    line = "\t".join(["%s"] * len(columns)) + "\n"
+    for start in range(0, nrows, COPY_CHUNK_SIZE):
+        stop = start + COPY_CHUNK_SIZE
+        lists = [np.asarray(c[start:stop]).tolist() for c in columns]
+        yield "".join([line % row for row in zip(*lists)])
+
+
+def _copy_from_arrays(engine, table, columns, nrows):
+    """Stream the columns into table with COPY ... FROM STDIN."""
+    sql = "COPY {} ({}) FROM STDIN".format(
+        table.name, ", ".join(columns.keys())
+    )
+    stream = _IteratorFile(_copy_chunks(list(columns.values()), nrows))
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.copy_expert(sql, stream)
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _insert_from_arrays(engine, table, columns, nrows):
+    """Insert the columns into table with an executemany INSERT."""
+    names = list(columns.keys())
+    lists = [np.asarray(c).tolist() for c in columns.values()]
+    rows = [dict(zip(names, row)) for row in zip(*lists)]
+    with engine.begin() as connection:
+        connection.execute(table.insert(), rows)
+
+
+def bulk_insert(engine, table, columns, method="auto"):
+    """
+    Insert columnar data into a table.
+
+    Parameters
+    ----------
+    engine : sqlalchemy engine
+    table : sqlalchemy Table
+        E.g. Minimum.__table__ .
+    columns : dict
+        Maps column names of table to equally long 1d arrays.
+    method : {"auto", "copy", "insert"}
+        "copy" streams the rows with PostgreSQL COPY FROM STDIN through
+        psycopg2, "insert" uses an executemany INSERT which works on every
+        backend (e.g. SQLite).  "auto" picks "copy" for PostgreSQL and
+        "insert" otherwise.
+
+    Returns
+    -------
+    nrows : int
+        The number of inserted rows.
+    """
+    nrows = len(next(iter(columns.values()))) if columns else 0
+    if nrows == 0:
+        return 0
+
+    if method == "auto":
+        method = "copy" if engine.dialect.name == "postgresql" else "insert"
+    if method == "copy":
+        if engine.dialect.name != "postgresql":
+            raise ValueError("COPY is only supported by PostgreSQL")
+        _copy_from_arrays(engine, table, columns, nrows)
+    elif method == "insert":
+        _insert_from_arrays(engine, table, columns, nrows)
+    else:
+        raise ValueError("unknown bulk insert method: {}".format(method))
+    return nrows
+
+
+def _drop_index(engine, index):
+    with engine.begin() as connection:
+        connection.execute(
+            text("DROP INDEX IF EXISTS {}".format(index.name))
+        )
+
+
+def _create_index(engine, index):
+    # IF NOT EXISTS instead of checkfirst, since SQLite does not reflect
+    # indexes on expressions such as ix_transition_states_pair.
+    sql = str(CreateIndex(index).compile(dialect=engine.dialect))
+    sql = re.sub(r"^CREATE (UNIQUE )?INDEX", r"\g<0> IF NOT EXISTS", sql)
+    with engine.begin() as connection:
+        connection.execute(text(sql))
+
+
+def analyze(engine, tables):
+    """
+    Update the statistics of the query planner for tables after a bulk 
+    load. Without them SQLite does not use the indexes of 
+    tbl_transition_states for OR conditions on both minima.
+    """
+    with engine.begin() as connection:
+        for table in tables:
+            connection.execute(text("ANALYZE {}".format(table.name)))
+
+
+def create_indexes(engine, tables):
+    """Create the indexes of tables which do not exist yet."""
+    for table in tables:
+        for index in table.indexes:
+            _create_index(engine, index)
+
+
+@contextmanager
+def deferred_indexes(engine, tables):
+    """
+    Drop the indexes of tables and recreate them when the block exits.
+
+    Building an index once after a bulk load is much cheaper than updating
+    it for every inserted row.
+    """
+    indexes = [index for table in tables for index in table.indexes]
+    for index in indexes:
+        _drop_index(engine, index)
+    try:
+        yield
+    finally:
+        for index in indexes:
+            _create_index(engine, index)
@@ -0,0 +1,196 @@
+""" Caches for the results of read queries of a Database."""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import os
+import pickle
+import sqlite3
+
+__all__ = ["QueryCache", "MemoryCache", "DiskCache"]
+
+
+class QueryCache(ABC):
+    """
+    Abstract base class of the query result caches, a mapping with a bound
+    on the number of entries and counters of hits and misses. Subclasses
+    implement put, _get and __len__.
+
+    Entries are evicted in least recently used order. The keys contain
+    the data version of the landscape, which is bumped on every write, so
+    stale entries are never returned and are evicted eventually.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries.
+
+    Attributes
+    ----------
+    maxsize : int
+    hits : int
+        The number of lookups which found an entry.
+    misses : int
+        The number of lookups which did not find an entry.
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("maxsize of a cache must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return the value of key and count the lookup.
+
+        Raises
+        ------
+        KeyError
+            If key is not in the cache.
+        """
+        try:
+            value = self._get(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    @abstractmethod
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry."""
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def _get(self, key):
+        """Return the value of key, raise KeyError if it is missing."""
+
+    @abstractmethod
+    def __len__(self):
+        """Return the number of entries."""
+
+    def __repr__(self):
+        return "<{}(entries={}, hits={}, misses={})>".format(
+            type(self).__name__, len(self), self.hits, self.misses
+        )
+
+
+class MemoryCache(QueryCache):
+    """
+    Query cache in the memory of the process.
+
+    The cached objects are returned as they are, they must not be
+    modified.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of entries, default is 128.
+    """
+
+    def __init__(self, maxsize=128):
+        super().__init__(maxsize)
+        self._entries = OrderedDict()
+
+    def _get(self, key):
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        super().clear()
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache(QueryCache):
+    """
+    Query cache in a SQLite file, which survives the process and can be
+    shared by processes on the same machine.
+
+    The values are pickled, ORM objects are returned detached from any
+    session.
+
+    Parameters
+    ----------
+    path : str
+        Path to the cache file, it is created if it does not exist.
+    maxsize : int, optional
+        The maximum number of entries, default is 1024.
+    """
+
+    def __init__(self, path, maxsize=1024):
+        super().__init__(maxsize)
+        self.path = os.path.abspath(path)
+        self._connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, used INTEGER)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_query_cache_used "
+            "ON query_cache (used)"
+        )
+
+    def _used(self):
+        """Return the next value of the recency counter."""
+        (used,) = self._connection.execute(
+            "SELECT coalesce(max(used), 0) + 1 FROM query_cache"
+        ).fetchone()
+        return used
+
+    def _get(self, key):
+        key = repr(key)
+        row = self._connection.execute(
+            "SELECT value FROM query_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        self._connection.execute(
+            "UPDATE query_cache SET used = ? WHERE key = ?",
+            (self._used(), key),
+        )
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?)",
+                (repr(key), sqlite3.Binary(data), self._used()),
+            )
+            self._connection.execute(
+                "DELETE FROM query_cache WHERE key IN (SELECT key FROM "
+                "query_cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def clear(self):
+        super().clear()
+        self._connection.execute("DELETE FROM query_cache")
+
+    def close(self):
+        """Close the connection to the cache file."""
+        self._connection.close()
+
+    def __len__(self):
+        (n,) = self._connection.execute(
+            "SELECT count(*) FROM query_cache"
+        ).fetchone()
+        return n
@@ -0,0 +1,76 @@
+""" Memory-mapped access to the PATHSAMPLE coordinate files."""
+
+import os
+
+import numpy as np
+
+__all__ = ["CoordinateStore"]
+
+
+class CoordinateStore(object):
+    """
+    Read-only, memory-mapped view of a PATHSAMPLE coordinate file.
+
+    PATHSAMPLE writes the coordinates of the minima to points.min and those
+    of the transition states to points.ts as unformatted direct access
+    files: record i holds the 3 * natoms coordinates of the stationary
+    point with id i, as raw float64 numbers without any record markers.
+
+    Parameters
+    ----------
+    path : str
+        Path to points.min or points.ts.
+    natoms : int
+        The number of atoms, i.e. each record has 3 * natoms numbers.
+    dtype : numpy dtype, optional
+        The type of the stored numbers, default is native float64.
+
+    Attributes
+    ----------
+    path : str
+    ncoords : int
+        The number of coordinates of a stationary point.
+    array : numpy memmap
+        Array of shape (number of records, ncoords). Nothing is read from
+        disk until a record is accessed.
+
+    Examples
+    --------
+    >>> store = CoordinateStore("points.min", natoms=38)
+    >>> coords = store[1]  # coordinates of the minimum with id 1
+    """
+
+    def __init__(self, path, natoms, dtype=np.float64):
+        self.path = path
+        self.ncoords = 3 * int(natoms)
+        dtype = np.dtype(dtype)
+        record_size = self.ncoords * dtype.itemsize
+        size = os.path.getsize(path)
+        if self.ncoords <= 0 or size % record_size != 0:
+            raise ValueError(
+                "size of {} ({} bytes) is not a multiple of the record "
+                "size for {} atoms".format(path, size, natoms)
+            )
+        nrecords = size // record_size
+        if nrecords == 0:
+            self.array = np.zeros((0, self.ncoords), dtype=dtype)
+        else:
+            self.array = np.memmap(
+                path, dtype=dtype, mode="r", shape=(nrecords, self.ncoords)
+            )
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __getitem__(self, id):
+        """Return a zero-copy view of the coordinates of record `id`."""
+        if not 1 <= id <= len(self):
+            raise KeyError(
+                "no coordinates for id {} in {}".format(id, self.path)
+            )
+        return self.array[id - 1]
+
+    def __repr__(self):
+        return "<CoordinateStore(path='{}', records='{}')>".format(
+            self.path, len(self)
+        )
@@ -2,20 +2,98 @@
 
 import numpy as np
 
-from sqlalchemy import create_engine, and_, or_
-from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, Float, PickleType
+from sqlalchemy import and_, or_, select, bindparam, text, tuple_, any_
+from sqlalchemy import type_coerce, LargeBinary, func, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import object_session
+from sqlalchemy import Column, Integer, BigInteger, Float, PickleType, String
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, ForeignKeyConstraint, Index
 from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects.postgresql import ARRAY
 
+import functools
 import os
-
-__all__ = ["Minimum", "TransitionState", "Database"]
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from .coords import CoordinateStore
+from .bulk import create_indexes
+from .engine import get_engine, get_sessionmaker
+from .functions import least, greatest
+from .types import ArrayType, encode_array, decode_array, is_encoded_array
+
+__all__ = [
+    "Landscape",
+    "Minimum",
+    "TransitionState",
+    "ImportCheckpoint",
+    "LandscapeStatistics",
+    "Database",
+]
 
 Base = declarative_base()
 
+# Keys of Session.info under which CoordinateStores are attached.
+MINIMUM_COORDS = "viewland_minimum_coords"
+TRANSITION_STATE_COORDS = "viewland_transition_state_coords"
+
+
+def _attached_coords(obj, key):
+    """
+    Return the coordinates of obj from the CoordinateStore attached to its 
+    session, or None if there is no store or it does not contain obj.
+    """
+    session = object_session(obj)
+    if session is None or obj._id is None:
+        return None
+    store = session.info.get(key)
+    if store is None or obj._id > len(store):
+        return None
+    return store[obj._id]
+
+
+# Engines whose tables have been created by this process.
+_schema_created = set()
+
+# Fields of the arrays returned by Database.minima_arrays and
+# Database.transition_state_arrays.
+MINIMA_ARRAY_DTYPE = np.dtype(
+    [("id", "i8"), ("energy", "f8"), ("fvib", "f8"), ("pgorder", "i4")]
+)
+TRANSITION_STATE_ARRAY_DTYPE = np.dtype(
+    [
+        ("id", "i8"),
+        ("energy", "f8"),
+        ("fvib", "f8"),
+        ("pgorder", "i4"),
+        ("min1", "i8"),
+        ("min2", "i8"),
+    ]
+)
+
+# Number of rows fetched at a time by the array queries.
+ARRAY_FETCH_SIZE = 65536
+
+# Maximum number of values in one IN (...) list of the batch lookups. Older
+# SQLite versions allow at most 999 parameters per statement.
+MAX_IN_PARAMETERS = 400
+
+
+def create_sqlite_connect_string(path: str = None):
+    """
+    Create sqlalchemy connection string to a SQLite database file, or to an
+    in-memory database if path is None or ":memory:".
+
+    SQLite needs no server, which suits local and batch runs. An in-memory
+    database is shared by all Database objects of the process and is lost
+    when it exits.
+    """
+    if path is None or path == ":memory:":
+        return "sqlite://"
+    return "sqlite:///{}".format(os.path.abspath(path))
+
 
 def create_connect_string(
     user: str = None,
@@ -23,11 +101,26 @@ def create_connect_string(
     database_name: str = None,
     port: str = None,
     host: str = None,
+    **pool_options
 ):
     """
     Create sqlalchemy connection string to the postgresql database using 
     either user inputs or environment variables.
+
+    The connection pool options pool_size, max_overflow, pool_pre_ping and
+    pool_recycle can be given as keyword arguments. They are added to the 
+    query of the connection string and applied by engine.get_engine .
+
+    If no connection details are given and the environment variable 
+    VIEWLAND_SQLITE is set, the connection string of the SQLite database
+    file it names is returned instead, see create_sqlite_connect_string.
     """
+    if not any([user, password, database_name, port, host]) and (
+        os.environ.get("VIEWLAND_SQLITE")
+    ):
+        string = create_sqlite_connect_string(os.environ["VIEWLAND_SQLITE"])
+        print("The connection string is: ", string)
+        return string
     if not all([user, password, database_name, port, host]):
         print(
             "Incomplete information provided. "
@@ -42,10 +135,67 @@ def create_connect_string(
     string = "postgresql+psycopg2://{}:{}@{}:{}/{}".format(
         user, password, host, port, database_name
     )
+    query = {
+        name: value
+        for name, value in sorted(pool_options.items())
+        if value is not None
+    }
+    if query:
+        string += "?" + urlencode(query)
     print("The connection string is: ", string)
     return string
 
 
+class Landscape(Base):
+    """
+    The Landscape class represents one energy landscape in the database.
+
+    Minima and transition states of many landscapes can be stored in the 
+    same database. Their ids are local to the landscape, i.e. they are the 
+    line numbers in min.data and ts.data.
+
+    Parameters
+    ----------
+    name : str
+        Unique name of the landscape.
+
+    Attributes
+    ----------
+    version : int
+        Version of the data of the landscape, it is incremented by every 
+        write, see Database.bump_version .
+    uuid : str
+        Random identifier of the landscape, which tells landscapes of 
+        different databases apart, also of a database which was recreated.
+
+    See Also
+    --------
+    Database
+    """
+
+    __tablename__ = "tbl_landscapes"
+
+    _id = Column(Integer, primary_key=True)
+
+    name = Column(String, unique=True, nullable=False)
+
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    uuid = Column(String)
+
+    def __init__(self, name):
+        self.name = name
+        self.version = 0
+        self.uuid = uuid4().hex
+
+    def id(self):
+        """Return the sql id of the object"""
+        return self._id
+
+    def __repr__(self):
+        return "<Landscape(id='{}', name='{}')>".format(self._id, self.name)
+
+
 class Minimum(Base):
     """
     The Minimum class represents a minimum in the database.
@@ -59,11 +209,15 @@ class Minimum(Base):
 
     Attributes
     ----------
+    landscape_id :
+        The id of the landscape the minimum belongs to.
     energy :
         The energy of the minimum.
     coords :
-        The coordinates of the minimum.  This is stored as a pickled numpy
-        array which SQL interprets as a BLOB.
+        The coordinates of the minimum.  If a CoordinateStore is attached
+        to the database (see Database.attach_coordinates) this is a 
+        read-only view of the memory-mapped points.min file.  Otherwise it
+        is stored as raw bytes of the numpy array (see types.ArrayType).
     fvib :
         The log product of the squared normal mode frequencies.
     pgorder :
@@ -83,12 +237,18 @@ class Minimum(Base):
     """
 
     __tablename__ = "tbl_minima"
+    # on PostgreSQL each landscape is stored in its own partition, see
+    # Database.
+    __table_args__ = dict(postgresql_partition_by="LIST (landscape_id)")
 
-    _id = Column(Integer, primary_key=True)
+    landscape_id = Column(
+        Integer, ForeignKey("tbl_landscapes._id"), primary_key=True
+    )
+    _id = Column(Integer, primary_key=True, autoincrement=False)
     energy = Column(Float)
     # deferred means the object is loaded on demand,
     # that saves some time / memory for huge graphs.
-    coords = deferred(Column(PickleType))
+    _coords = deferred(Column("coords", ArrayType))
 
     fvib = Column(Float)
 
@@ -103,6 +263,17 @@ class Minimum(Base):
         self.coords = np.copy(coords)
         self.invalid = False
 
+    @property
+    def coords(self):
+        coords = _attached_coords(self, MINIMUM_COORDS)
+        if coords is None:
+            return self._coords
+        return coords
+
+    @coords.setter
+    def coords(self, coords):
+        self._coords = coords
+
     def id(self):
         """Return the sql id of the object"""
         return self._id
@@ -152,11 +323,15 @@ class TransitionState(Base):
 
     Attributes
     ----------
+    landscape_id :
+        The id of the landscape the transition state belongs to.
     energy :
         The energy of the transition state.
     coords :
-        The coordinates of the transition state.  This is stored as a pickled 
-        numpy array which SQL interprets as a BLOB.
+        The coordinates of the transition state.  If a CoordinateStore is 
+        attached to the database (see Database.attach_coordinates) this is 
+        a read-only view of the memory-mapped points.ts file.  Otherwise it
+        is stored as raw bytes of the numpy array (see types.ArrayType).
     fvib :
         The log product of the squared normal mode frequencies.
     pgorder :
@@ -185,25 +360,47 @@ class TransitionState(Base):
     """
 
     __tablename__ = "tbl_transition_states"
-    _id = Column(Integer, primary_key=True)
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["landscape_id", "_minimum1_id"],
+            ["tbl_minima.landscape_id", "tbl_minima._id"],
+        ),
+        ForeignKeyConstraint(
+            ["landscape_id", "_minimum2_id"],
+            ["tbl_minima.landscape_id", "tbl_minima._id"],
+        ),
+        dict(postgresql_partition_by="LIST (landscape_id)"),
+    )
+
+    landscape_id = Column(
+        Integer, ForeignKey("tbl_landscapes._id"), primary_key=True
+    )
+    _id = Column(Integer, primary_key=True, autoincrement=False)
 
     energy = Column(Float)
 
-    coords = deferred(Column(PickleType))
+    _coords = deferred(Column("coords", ArrayType))
 
-    _minimum1_id = Column(Integer, ForeignKey("tbl_minima._id"))
+    # both minima share the landscape_id of the transition state.
+    _minimum1_id = Column(Integer)
     minimum1 = relationship(
-        "Minimum", primaryjoin="Minimum._id==TransitionState._minimum1_id"
+        "Minimum",
+        primaryjoin="and_(Minimum.landscape_id==TransitionState.landscape_id,"
+        " Minimum._id==TransitionState._minimum1_id)",
+        overlaps="minimum2",
     )
 
-    _minimum2_id = Column(Integer, ForeignKey("tbl_minima._id"))
+    _minimum2_id = Column(Integer)
     minimum2 = relationship(
-        "Minimum", primaryjoin="Minimum._id==TransitionState._minimum2_id"
+        "Minimum",
+        primaryjoin="and_(Minimum.landscape_id==TransitionState.landscape_id,"
+        " Minimum._id==TransitionState._minimum2_id)",
+        overlaps="minimum1",
     )
 
     eigenval = Column(Float)
 
-    eigenvec = deferred(Column(PickleType))
+    eigenvec = deferred(Column(ArrayType))
 
     fvib = Column(Float)
 
@@ -233,6 +430,17 @@ class TransitionState(Base):
         self.eigenval = eigenval
         self.invalid = False
 
+    @property
+    def coords(self):
+        coords = _attached_coords(self, TRANSITION_STATE_COORDS)
+        if coords is None:
+            return self._coords
+        return coords
+
+    @coords.setter
+    def coords(self, coords):
+        self._coords = coords
+
     def id(self):
         """Return the sql id of the object."""
         return self._id
@@ -243,6 +451,253 @@ class TransitionState(Base):
         )
 
 
+# Indexes of minima and transition states. They lead with landscape_id, so
+# that they also serve as the local indexes of each partition. The
+# postgresql_include columns of the energy indexes are the columns selected
+# by Database.minima_arrays and Database.transition_state_arrays, so these
+# are answered by index-only scans. The ORM queries load every column, they
+# only find their rows through the indexes. The Converter builds the 
+# indexes after a bulk load, see bulk.deferred_indexes .
+Index(
+    "ix_minima_energy",
+    Minimum.landscape_id,
+    Minimum.energy,
+    postgresql_include=["_id", "fvib", "pgorder"],
+)
+Index(
+    "ix_transition_states_minimum1",
+    TransitionState.landscape_id,
+    TransitionState._minimum1_id,
+    postgresql_include=["_minimum2_id"],
+)
+Index(
+    "ix_transition_states_minimum2",
+    TransitionState.landscape_id,
+    TransitionState._minimum2_id,
+    postgresql_include=["_minimum1_id"],
+)
+Index(
+    "ix_transition_states_energy",
+    TransitionState.landscape_id,
+    TransitionState.energy,
+    postgresql_include=[
+        "_id",
+        "fvib",
+        "pgorder",
+        "_minimum1_id",
+        "_minimum2_id",
+    ],
+)
+# Looks up the transition states between a pair of minima in either order.
+Index(
+    "ix_transition_states_pair",
+    TransitionState.landscape_id,
+    least(TransitionState._minimum1_id, TransitionState._minimum2_id),
+    greatest(TransitionState._minimum1_id, TransitionState._minimum2_id),
+)
+
+
+class LandscapeStatistics(Base):
+    """
+    The LandscapeStatistics class holds global facts about a landscape, 
+    which are computed by the Converter when the data is imported.
+
+    Parameters
+    ----------
+    landscape_id : int
+        The id of the landscape.
+    **statistics :
+        The attributes below, e.g. from 
+        viewland.utils.statistics.landscape_statistics .
+
+    Attributes
+    ----------
+    nminima, ntransition_states :
+        The number of minima and transition states.
+    global_minimum_id :
+        The id of the minimum with the lowest energy.
+    minimum_energy_min, minimum_energy_max :
+        The lowest and highest energy of the minima.
+    minimum_energy_quantiles :
+        Array of the quantiles of the energies of the minima at the 
+        probabilities viewland.utils.statistics.QUANTILE_LEVELS .
+    ts_energy_min, ts_energy_max :
+        The lowest and highest energy of the transition states.
+    ts_energy_quantiles :
+        Array of the quantiles of the transition state energies.
+    ts_energy_histogram, ts_energy_bin_edges :
+        Histogram of the transition state energies, the counts and the 
+        edges of the bins as from numpy.histogram .
+    nself_connected :
+        The number of transition states which connect a minimum to itself.
+    ncomponents :
+        The number of connected components of the graph of minima and 
+        transition states.
+
+    See Also
+    --------
+    viewland.utils.Converter, viewland.utils.DisconnectivityGraph
+    """
+
+    __tablename__ = "tbl_landscape_statistics"
+
+    landscape_id = Column(
+        Integer, ForeignKey("tbl_landscapes._id"), primary_key=True
+    )
+
+    nminima = Column(BigInteger)
+
+    ntransition_states = Column(BigInteger)
+
+    global_minimum_id = Column(Integer)
+
+    minimum_energy_min = Column(Float)
+
+    minimum_energy_max = Column(Float)
+
+    minimum_energy_quantiles = Column(ArrayType)
+
+    ts_energy_min = Column(Float)
+
+    ts_energy_max = Column(Float)
+
+    ts_energy_quantiles = Column(ArrayType)
+
+    ts_energy_histogram = Column(ArrayType)
+
+    ts_energy_bin_edges = Column(ArrayType)
+
+    nself_connected = Column(BigInteger)
+
+    ncomponents = Column(BigInteger)
+
+    def __init__(self, landscape_id, **statistics):
+        self.landscape_id = landscape_id
+        for name, value in statistics.items():
+            if not hasattr(LandscapeStatistics, name):
+                raise ValueError("unknown statistic {}".format(name))
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return "<LandscapeStatistics(landscape_id='{}')>".format(
+            self.landscape_id
+        )
+
+
+class ImportCheckpoint(Base):
+    """
+    The ImportCheckpoint class records how much of a source file has been
+    imported into the database.
+
+    Parameters
+    ----------
+    landscape_id : int
+        The id of the landscape the file was imported into.
+    source : str
+        Name of the source, e.g. "min.data" or "ts.data".
+    path : str
+        Path of the file the data was read from.
+    offset : int
+        Number of bytes of the file which have been imported.
+    nlines : int
+        Number of records which have been imported.
+    digest : str
+        SHA-256 hex digest of the first `offset` bytes of the file.
+    mtime_ns : int, optional
+        Modification time of the file when it was imported completely, in
+        nanoseconds. Together with the size (equal to offset) and digest
+        this is the fingerprint used to detect unchanged inputs.
+
+    See Also
+    --------
+    viewland.utils.Converter
+    """
+
+    __tablename__ = "tbl_import_checkpoints"
+
+    landscape_id = Column(
+        Integer, ForeignKey("tbl_landscapes._id"), primary_key=True
+    )
+
+    source = Column(String, primary_key=True)
+
+    path = Column(String)
+
+    offset = Column(BigInteger)
+
+    nlines = Column(BigInteger)
+
+    digest = Column(String)
+
+    mtime_ns = Column(BigInteger)
+
+    def __init__(
+        self, landscape_id, source, path, offset, nlines, digest, mtime_ns=None
+    ):
+        self.landscape_id = landscape_id
+        self.source = source
+        self.path = path
+        self.offset = offset
+        self.nlines = nlines
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+
+    def __repr__(self):
+        return "<ImportCheckpoint(source='{}', nlines='{}')>".format(
+            self.source, self.nlines
+        )
+
+
+# Tables which are partitioned by landscape on PostgreSQL.
+PARTITIONED_TABLES = [Minimum.__table__, TransitionState.__table__]
+
+# Tables which were created without a landscape_id column by versions of
+# viewland that stored a single landscape, in the order they are copied.
+BASELINE_TABLES = [
+    Minimum.__table__,
+    TransitionState.__table__,
+    ImportCheckpoint.__table__,
+]
+
+# Suffix of the baseline tables while their rows are copied, see
+# Database._migrate_baseline_tables .
+BASELINE_SUFFIX = "_baseline"
+
+# Name of the landscape which is opened by default, and into which the
+# data of baseline tables is migrated.
+DEFAULT_LANDSCAPE = "default"
+
+
+def _cached(method):
+    """
+    Decorator of the read queries of Database, whose results are stored in
+    Database.cache under the name and arguments of the query and the uuid
+    and data version of the landscape. The uuid keeps apart the results of
+    different databases which share a cache.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache is None:
+            return method(self, *args, **kwargs)
+        uuid, version = self._data_key()
+        key = (
+            method.__name__,
+            uuid,
+            version,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        try:
+            return self._attach(self.cache.get(key))
+        except KeyError:
+            value = method(self, *args, **kwargs)
+            self.cache.put(key, value)
+            return value
+
+    return wrapper
+
+
 class Database(object):
     """
     Database storage class uses SQLAlchemy to handle the connection to the 
@@ -251,14 +706,53 @@ class Database(object):
     Parameters
     ----------
     connect_string : string
-        Connection string for sqlalchemy.create_engine .
+        Connection string for sqlalchemy.create_engine . The engine, and 
+        with it the connection pool, is shared by all Database objects of 
+        the process with the same connection string, see 
+        engine.get_engine .
     createdb : boolean, optional
         Create database if not exists, default is true.
+    reset : boolean, optional
+        Remove the minima and transition states of the landscape and start 
+        from an empty landscape, default is false, i.e. the data of a 
+        previous import is kept. Other landscapes are never touched.
+    landscape : str, optional
+        Name of the landscape to open. It is created if it does not exist
+        yet, default is "default".
+    cache : QueryCache, optional
+        Cache for the results of the read queries, e.g. a 
+        cache.MemoryCache or a cache.DiskCache. Default is no cache.
 
     Attributes
     ----------
     engine : sqlalchemy database engine
     session : sqlalchemy session
+    landscape : str
+        Name of the landscape.
+    landscape_id : int
+        The id of the landscape, all queries are restricted to it.
+    cache : QueryCache or None
+
+    Notes
+    -----
+    The tables are created if they are missing but never dropped, so many
+    landscapes can be stored in, and served concurrently from, the same 
+    database. On PostgreSQL the tables of minima and transition states are
+    partitioned by landscape (LIST partitioning), each landscape is a 
+    partition of its own.
+
+    Tables of minima and transition states created by earlier versions, 
+    which held a single landscape, are migrated into the landscape 
+    "default" when the database is first opened.
+
+    With a cache, the results of get_lowest_energy_minimum, minima, 
+    transition_states, minima_arrays, transition_state_arrays, 
+    number_of_minima and number_of_transition_states are cached under 
+    the uuid and the data version of the landscape. Writes through 
+    Database and Converter bump the version, so cached results are never
+    stale, and the uuid is unique to the landscape, so a cache can be 
+    shared by several databases. The cached objects are shared, they must
+    not be modified.
 
     Examples
     --------
@@ -288,40 +782,388 @@ class Database(object):
     engine = None
     session = None
 
+    landscape = None
+    landscape_id = None
+    cache = None
+
     def __init__(
-        self, connect_string, createdb=True,
+        self,
+        connect_string,
+        createdb=True,
+        reset=False,
+        landscape=DEFAULT_LANDSCAPE,
+        cache=None,
     ):
         # createdb is not used right now.
-
-        # Drop all tables in the database and then create tables for Minimum
-        # and TransitionState.
-        self.engine = create_engine(connect_string)
-        Base.metadata.drop_all(self.engine)
-        Base.metadata.create_all(self.engine)
+        self.engine = get_engine(connect_string)
+        self.cache = cache
 
         # Set up the session which will manage the frontend connection
-        # to the database.
-        self.session = Session(bind=self.engine)
+        # to the database. Its connection is taken from the pool.
+        self.session = get_sessionmaker(self.engine)()
+
+        self._open(landscape, reset)
+
+    def _open(self, landscape, reset):
+        """Create the missing tables and open the landscape."""
+        # Create the missing tables and indexes once per engine, existing
+        # tables may hold the data of other landscapes. Indexes are missing
+        # e.g. if an earlier bulk load was interrupted.
+        if self.engine not in _schema_created:
+            self._rename_baseline_tables()
+            Base.metadata.create_all(self.engine)
+            self._add_missing_columns()
+            create_indexes(self.engine, PARTITIONED_TABLES)
+            self._migrate_baseline_tables()
+            _schema_created.add(self.engine)
+
+        self.landscape = landscape
+        self.landscape_id = self._open_landscape(landscape)
+        if reset:
+            self.reset()
+
+    def _add_missing_columns(self):
+        """
+        Add the columns which are missing in existing tables, e.g. 
+        Landscape.version in a database created by an earlier version. 
+        create_all only creates missing tables.
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = [
+                    c["name"] for c in inspector.get_columns(table.name)
+                ]
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    sql = "ALTER TABLE {} ADD COLUMN {} {}".format(
+                        table.name,
+                        column.name,
+                        column.type.compile(dialect=self.engine.dialect),
+                    )
+                    if column.server_default is not None:
+                        sql += " DEFAULT {}".format(
+                            column.server_default.arg
+                        )
+                        if not column.nullable:
+                            sql += " NOT NULL"
+                    connection.execute(text(sql))
+
+    def _rename_baseline_tables(self):
+        """
+        Move tables without a landscape_id column, which were created by 
+        earlier versions, out of the way of the current tables.
+        """
+        inspector = inspect(self.engine)
+        names = inspector.get_table_names()
+        baseline = [
+            table.name
+            for table in BASELINE_TABLES
+            if table.name in names
+            and "landscape_id"
+            not in [c["name"] for c in inspector.get_columns(table.name)]
+        ]
+        if len(baseline) == 0:
+            return
+        with self.engine.begin() as connection:
+            for name in baseline:
+                connection.execute(
+                    text(
+                        "ALTER TABLE {0} RENAME TO {0}{1}".format(
+                            name, BASELINE_SUFFIX
+                        )
+                    )
+                )
+
+    def _migrate_baseline_tables(self):
+        """
+        Copy the minima and transition states of renamed baseline tables
+        into the landscape DEFAULT_LANDSCAPE and drop the baseline tables.
+        Their import checkpoints are dropped, so that the next incremental
+        import reloads the files.
+        """
+        inspector = inspect(self.engine)
+        names = inspector.get_table_names()
+        baseline = [
+            table
+            for table in BASELINE_TABLES
+            if table.name + BASELINE_SUFFIX in names
+        ]
+        if len(baseline) == 0:
+            return
+        landscape_id = self._open_landscape(DEFAULT_LANDSCAPE)
+        with self.engine.begin() as connection:
+            for table in baseline:
+                if table is ImportCheckpoint.__table__:
+                    continue
+                # columns of the baseline table which still exist
+                columns = ", ".join(
+                    [
+                        c["name"]
+                        for c in inspector.get_columns(
+                            table.name + BASELINE_SUFFIX
+                        )
+                        if c["name"] in table.c
+                    ]
+                )
+                connection.execute(
+                    text(
+                        "INSERT INTO {0} (landscape_id, {1}) "
+                        "SELECT {2}, {1} FROM {0}{3}".format(
+                            table.name,
+                            columns,
+                            int(landscape_id),
+                            BASELINE_SUFFIX,
+                        )
+                    )
+                )
+            # transition states reference the minima, drop them first
+            for table in reversed(baseline):
+                connection.execute(
+                    text("DROP TABLE {}{}".format(table.name, BASELINE_SUFFIX))
+                )
+
+    def _open_landscape(self, name):
+        """Return the id of the landscape name, create it if needed."""
+        query = self.session.query(Landscape).filter(Landscape.name == name)
+        landscape = query.one_or_none()
+        if landscape is None:
+            try:
+                landscape = Landscape(name)
+                self.session.add(landscape)
+                self.session.commit()
+            except IntegrityError:
+                # another process created it in the meantime
+                self.session.rollback()
+                landscape = query.one()
+        if landscape.uuid is None:
+            # created by an earlier version, keep a uuid set concurrently
+            table = Landscape.__table__
+            self.session.execute(
+                table.update()
+                .where(
+                    and_(
+                        table.c._id == landscape.id(), table.c.uuid.is_(None)
+                    )
+                )
+                .values(uuid=uuid4().hex)
+            )
+            self.session.commit()
+        if self.engine.dialect.name == "postgresql":
+            self._create_partitions(landscape.id())
+        return landscape.id()
+
+    def _create_partitions(self, landscape_id):
+        """Create the PostgreSQL partitions of a landscape."""
+        with self.engine.begin() as connection:
+            for table in PARTITIONED_TABLES:
+                connection.execute(
+                    text(
+                        "CREATE TABLE IF NOT EXISTS {0}_{1} "
+                        "PARTITION OF {0} FOR VALUES IN ({1})".format(
+                            table.name, int(landscape_id)
+                        )
+                    )
+                )
+
+    def data_version(self):
+        """Return the version of the data of the landscape."""
+        return self._data_key()[1]
+
+    def _data_key(self):
+        """Return the uuid and the data version of the landscape."""
+        return (
+            self.session.query(Landscape.uuid, Landscape.version)
+            .filter(Landscape._id == self.landscape_id)
+            .one()
+        )
+
+    def bump_version(self):
+        """
+        Increment the version of the data of the landscape, which 
+        invalidates the cached query results. It must be called after
+        the minima or transition states of the landscape are written.
+        """
+        self.session.commit()
+        table = Landscape.__table__
+        with self.engine.begin() as connection:
+            connection.execute(
+                table.update()
+                .where(table.c._id == self.landscape_id)
+                .values(version=table.c.version + 1)
+            )
+
+    def _attach(self, value):
+        """Add the ORM objects of a cached value to the session."""
+        if isinstance(value, Base):
+            if value in self.session:
+                return value
+            return self.session.merge(value, load=False)
+        if isinstance(value, list):
+            return [self._attach(v) for v in value]
+        return value
+
+    def query(self, entity):
+        """
+        Return a session query for entity (Minimum, TransitionState or 
+        ImportCheckpoint) which is restricted to the landscape.
+        """
+        return self.session.query(entity).filter(
+            entity.landscape_id == self.landscape_id
+        )
+
+    def landscapes(self):
+        """Return the names of all landscapes in the database."""
+        return [
+            name
+            for name, in self.session.query(Landscape.name).order_by(
+                Landscape._id
+            )
+        ]
+
+    def reset(self):
+        """
+        Remove all minima, transition states, import checkpoints and 
+        statistics of the landscape. The data of other landscapes is kept.
+        """
+        self.session.commit()
+        with self.engine.begin() as connection:
+            for table in [
+                ImportCheckpoint.__table__,
+                LandscapeStatistics.__table__,
+                TransitionState.__table__,
+                Minimum.__table__,
+            ]:
+                connection.execute(
+                    table.delete().where(
+                        table.c.landscape_id == self.landscape_id
+                    )
+                )
+        self.bump_version()
+
+    def attach_coordinates(
+        self, points_min=None, points_ts=None, natoms=None
+    ):
+        """
+        Read the coordinates of minima and transition states from the 
+        PATHSAMPLE files points.min and points.ts instead of the database.
+
+        The files are memory-mapped, so Minimum.coords and 
+        TransitionState.coords become zero-copy views which are only read 
+        from disk when accessed.
+
+        Parameters
+        ----------
+        points_min : str, optional
+            Path to points.min.
+        points_ts : str, optional
+            Path to points.ts.
+        natoms : int
+            The number of atoms of the system.
+        """
+        if natoms is None:
+            raise ValueError("natoms is required to read coordinate files")
+        if points_min is not None:
+            self.session.info[MINIMUM_COORDS] = CoordinateStore(
+                points_min, natoms
+            )
+        if points_ts is not None:
+            self.session.info[TRANSITION_STATE_COORDS] = CoordinateStore(
+                points_ts, natoms
+            )
+
+    def migrate_pickled_arrays(self, batch_size=10000):
+        """
+        Rewrite array columns written by PickleType in the format of 
+        types.ArrayType.
+
+        Returns
+        -------
+        nmigrated : int
+            The number of migrated values.
+        """
+        nmigrated = 0
+        columns = [
+            Minimum.__table__.c.coords,
+            TransitionState.__table__.c.coords,
+            TransitionState.__table__.c.eigenvec,
+        ]
+        for column in columns:
+            table = column.table
+            in_landscape = table.c.landscape_id == self.landscape_id
+            # read the stored bytes without decoding them
+            raw = type_coerce(column, LargeBinary)
+            last_id = 0
+            while True:
+                rows = self.engine.execute(
+                    select([table.c._id, raw])
+                    .where(
+                        and_(
+                            in_landscape,
+                            table.c._id > last_id,
+                            column.isnot(None),
+                        )
+                    )
+                    .order_by(table.c._id)
+                    .limit(batch_size)
+                ).fetchall()
+                if len(rows) == 0:
+                    break
+                last_id = rows[-1][0]
+                updates = [
+                    dict(row_id=id, value=encode_array(decode_array(data)))
+                    for id, data in rows
+                    if not is_encoded_array(data)
+                ]
+                if len(updates) > 0:
+                    self.engine.execute(
+                        table.update()
+                        .where(
+                            and_(
+                                in_landscape,
+                                table.c._id == bindparam("row_id"),
+                            )
+                        )
+                        .values(
+                            {
+                                column.name: bindparam(
+                                    "value", type_=LargeBinary
+                                )
+                            }
+                        ),
+                        updates,
+                    )
+                nmigrated += len(updates)
+        if nmigrated > 0:
+            self.bump_version()
+        return nmigrated
 
     def close(self):
-        """Close the connection to the database."""
+        """
+        Close the session, its connection is returned to the pool of the 
+        shared engine.
+        """
         self.session.commit()
         self.session.close()
 
+    @_cached
     def get_lowest_energy_minimum(self):
         """Return the minimum with the lowest energy."""
         candidates = (
-            self.session.query(Minimum).order_by(Minimum.energy).limit(1).all()
+            self.query(Minimum).order_by(Minimum.energy).limit(1).all()
         )
         return candidates[0]
 
     def get_minimum_from_id(self, id):
         """Return the minimum with a given id. """
-        return self.session.query(Minimum).get(id)
+        return self.session.query(Minimum).get((self.landscape_id, id))
 
     def get_transition_state_from_id(self, id):
         """Return the transition state with a given id. """
-        return self.session.query(TransitionState).get(id)
+        return self.session.query(TransitionState).get(
+            (self.landscape_id, id)
+        )
 
     def get_transition_state_between_minima(
         self, min1: Minimum, min2: Minimum
@@ -332,18 +1174,15 @@ class Database(object):
         -------
         ts : None or TransitionState
         """
-        m1, m2 = min1, min2
-        candidates = self.session.query(TransitionState).filter(
-            or_(
-                and_(
-                    TransitionState.minimum1 == m1,
-                    TransitionState.minimum2 == m2,
-                ),
-                and_(
-                    TransitionState.minimum1 == m2,
-                    TransitionState.minimum2 == m1,
-                ),
+        m1, m2 = sorted([min1.id(), min2.id()])
+        # the same expressions as in the index ix_transition_states_pair
+        candidates = self.query(TransitionState).filter(
+            least(TransitionState._minimum1_id, TransitionState._minimum2_id)
+            == m1,
+            greatest(
+                TransitionState._minimum1_id, TransitionState._minimum2_id
             )
+            == m2,
         )
 
         for m in candidates:
@@ -358,15 +1197,140 @@ class Database(object):
         -------
         ts : None or TransitionState
         """
-        candidates = self.session.query(TransitionState).filter(
+        candidates = self.query(TransitionState).filter(
             or_(
-                TransitionState.minimum1 == min1,
-                TransitionState.minimum2 == min1,
+                TransitionState._minimum1_id == min1.id(),
+                TransitionState._minimum2_id == min1.id(),
             )
         )
 
         return candidates.all()
 
+    def _chunks(self, values):
+        """
+        Split a list of values for IN lists. PostgreSQL gets all values at 
+        once, as an array parameter.
+        """
+        if self.engine.dialect.name == "postgresql":
+            return [values] if len(values) > 0 else []
+        return [
+            values[i : i + MAX_IN_PARAMETERS]
+            for i in range(0, len(values), MAX_IN_PARAMETERS)
+        ]
+
+    def _in(self, column, values):
+        """Return column IN values, column = ANY(array) on PostgreSQL."""
+        if self.engine.dialect.name == "postgresql":
+            return column == any_(
+                bindparam(None, values, type_=ARRAY(Integer))
+            )
+        return column.in_(values)
+
+    def _pairs_query(self, lower, upper, pairs):
+        """
+        Return a query of the transition states with (lower, upper) in 
+        pairs. On PostgreSQL the pairs are joined as two array parameters
+        with unnest, instead of a tuple list with two parameters per pair.
+        """
+        query = self.query(TransitionState)
+        if self.engine.dialect.name != "postgresql":
+            return query.filter(tuple_(lower, upper).in_(pairs))
+        lowers, uppers = [list(values) for values in zip(*pairs)]
+        table = (
+            func.unnest(
+                bindparam(None, lowers, type_=ARRAY(Integer)),
+                bindparam(None, uppers, type_=ARRAY(Integer)),
+            )
+            .table_valued("lower_id", "upper_id")
+            .render_derived(name="pairs")
+        )
+        return query.join(
+            table,
+            and_(lower == table.c.lower_id, upper == table.c.upper_id),
+        )
+
+    def get_minima_by_ids(self, ids):
+        """
+        Return the minima with the given ids in one query.
+
+        Parameters
+        ----------
+        ids : array of int
+
+        Returns
+        -------
+        minima : list
+            The Minimum for each id in the order of ids, None for ids which
+            are not in the database.
+        """
+        ids = np.asarray(ids, dtype=np.int64).ravel().tolist()
+        found = {}
+        for chunk in self._chunks(sorted(set(ids))):
+            for m in self.query(Minimum).filter(self._in(Minimum._id, chunk)):
+                found[m.id()] = m
+        return [found.get(id) for id in ids]
+
+    def get_transition_states_for_minima(self, ids):
+        """
+        Return all transition states connected to any of the minima with 
+        the given ids in one query.
+
+        Parameters
+        ----------
+        ids : array of int
+
+        Returns
+        -------
+        ts : list of TransitionState
+            Ordered by id.
+        """
+        ids = sorted(set(np.asarray(ids, dtype=np.int64).ravel().tolist()))
+        found = {}
+        for chunk in self._chunks(ids):
+            candidates = self.query(TransitionState).filter(
+                or_(
+                    self._in(TransitionState._minimum1_id, chunk),
+                    self._in(TransitionState._minimum2_id, chunk),
+                )
+            )
+            for ts in candidates:
+                found[ts.id()] = ts
+        return [found[id] for id in sorted(found)]
+
+    def get_transition_states_between_pairs(self, pairs):
+        """
+        Return the transition states between pairs of minima in one query.
+
+        Parameters
+        ----------
+        pairs : array of int, shape (n, 2)
+            Ids of the minima, the order within a pair does not matter.
+
+        Returns
+        -------
+        ts : list
+            The TransitionState for each pair in the order of pairs, or 
+            None if the minima are not connected. Of several transition 
+            states between the same minima the lowest in energy is given.
+        """
+        pairs = np.sort(np.asarray(pairs, dtype=np.int64).reshape(-1, 2))
+        pairs = [tuple(pair) for pair in pairs.tolist()]
+        lower = least(
+            TransitionState._minimum1_id, TransitionState._minimum2_id
+        )
+        upper = greatest(
+            TransitionState._minimum1_id, TransitionState._minimum2_id
+        )
+        found = {}
+        # the expressions match the index ix_transition_states_pair
+        for chunk in self._chunks(sorted(set(pairs))):
+            for ts in self._pairs_query(lower, upper, chunk):
+                pair = tuple(sorted([ts._minimum1_id, ts._minimum2_id]))
+                if pair not in found or ts.energy < found[pair].energy:
+                    found[pair] = ts
+        return [found.get(pair) for pair in pairs]
+
+    @_cached
     def minima(self, order_energy=True):
         """
         Return an iterator over all minima in database.
@@ -381,10 +1345,11 @@ class Database(object):
         min : Minimum
         """
         if order_energy:
-            return self.session.query(Minimum).order_by(Minimum.energy).all()
+            return self.query(Minimum).order_by(Minimum.energy).all()
         else:
-            return self.session.query(Minimum).all()
+            return self.query(Minimum).all()
 
+    @_cached
     def transition_states(self, order_energy=False):
         """
         Return an iterator over all transition states in database.
@@ -400,17 +1365,267 @@ class Database(object):
         """
         if order_energy:
             return (
-                self.session.query(TransitionState)
+                self.query(TransitionState)
                 .order_by(TransitionState.energy)
                 .all()
             )
         else:
-            return self.session.query(TransitionState).all()
+            return self.query(TransitionState).all()
+
+    def _stream(self, query, batch_size):
+        """
+        Iterate over the results of query, fetching batch_size rows at a 
+        time from a server-side cursor.
+        """
+        return iter(
+            query.execution_options(stream_results=True).yield_per(
+                batch_size
+            )
+        )
+
+    def iter_minima(self, order_energy=True, batch_size=10000):
+        """
+        Iterate over all minima in the database in constant memory.
+
+        Unlike minima(), the rows are streamed from a server-side cursor 
+        (on PostgreSQL) and turned into Minimum objects batch_size at a 
+        time, so the first minima are available before the query has 
+        finished.
+
+        Parameters
+        ----------
+        order_energy : bool
+            Whether order the minima by energy.
+        batch_size : int
+            The number of rows fetched at a time.
+
+        Returns
+        -------
+        min : iterator of Minimum
+        """
+        query = self.query(Minimum)
+        if order_energy:
+            query = query.order_by(Minimum.energy)
+        return self._stream(query, batch_size)
+
+    def iter_transition_states(self, order_energy=False, batch_size=10000):
+        """
+        Iterate over all transition states in the database in constant 
+        memory, see iter_minima.
+
+        Parameters
+        ----------
+        order_energy : bool
+            Whether order the transition states by energy.
+        batch_size : int
+            The number of rows fetched at a time.
+
+        Returns
+        -------
+        ts : iterator of TransitionState
+        """
+        query = self.query(TransitionState)
+        if order_energy:
+            query = query.order_by(TransitionState.energy)
+        return self._stream(query, batch_size)
+
+    def _iter_array(
+        self, table, columns, dtype, emax, order_energy, batch_size
+    ):
+        """
+        Run a core SELECT of columns of table in the landscape and yield 
+        the rows as structured arrays of dtype, batch_size rows at a time.
+        """
+        statement = select(*columns).where(
+            table.c.landscape_id == self.landscape_id
+        )
+        if emax is not None:
+            statement = statement.where(table.c.energy <= emax)
+        if order_energy == "desc":
+            statement = statement.order_by(table.c.energy.desc())
+        elif order_energy:
+            statement = statement.order_by(table.c.energy)
+        else:
+            statement = statement.order_by(table.c._id)
+
+        with self.engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True
+            ).execute(statement)
+            while True:
+                rows = result.fetchmany(batch_size)
+                if len(rows) == 0:
+                    break
+                yield np.array(list(map(tuple, rows)), dtype=dtype)
+
+    def _select_array(self, table, columns, dtype, emax, order_energy):
+        """
+        Run a core SELECT of columns of table in the landscape and return
+        the rows as a structured array of dtype.
+        """
+        chunks = list(
+            self._iter_array(
+                table, columns, dtype, emax, order_energy, ARRAY_FETCH_SIZE
+            )
+        )
+        if len(chunks) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.concatenate(chunks)
+
+    def _minima_columns(self):
+        table = Minimum.__table__
+        return [
+            table.c._id,
+            table.c.energy,
+            table.c.fvib,
+            func.coalesce(table.c.pgorder, 0),
+        ]
+
+    def _transition_state_columns(self):
+        table = TransitionState.__table__
+        return [
+            table.c._id,
+            table.c.energy,
+            table.c.fvib,
+            func.coalesce(table.c.pgorder, 0),
+            table.c._minimum1_id,
+            table.c._minimum2_id,
+        ]
+
+    @_cached
+    def minima_arrays(self, emax=None, order_energy=False):
+        """
+        Return the minima as a structured numpy array, without creating 
+        Minimum objects.
+
+        Parameters
+        ----------
+        emax : float, optional
+            Only return minima with energy <= emax. The filter is applied 
+            by the database.
+        order_energy : bool or "desc", optional
+            Order by energy, ascending if True or descending if "desc".
+            Otherwise the minima are ordered by id.
+
+        Returns
+        -------
+        minima : numpy array
+            With the fields id, energy, fvib and pgorder (0 if unknown).
+        """
+        return self._select_array(
+            Minimum.__table__,
+            self._minima_columns(),
+            MINIMA_ARRAY_DTYPE,
+            emax,
+            order_energy,
+        )
+
+    @_cached
+    def transition_state_arrays(self, emax=None, order_energy=False):
+        """
+        Return the transition states as a structured numpy array, without 
+        creating TransitionState objects.
+
+        Parameters
+        ----------
+        emax : float, optional
+            Only return transition states with energy <= emax. The filter
+            is applied by the database.
+        order_energy : bool or "desc", optional
+            Order by energy, ascending if True or descending if "desc".
+            Otherwise the transition states are ordered by id.
+
+        Returns
+        -------
+        transition_states : numpy array
+            With the fields id, energy, fvib, pgorder (0 if unknown), min1 
+            and min2, the ids of the connected minima.
+        """
+        return self._select_array(
+            TransitionState.__table__,
+            self._transition_state_columns(),
+            TRANSITION_STATE_ARRAY_DTYPE,
+            emax,
+            order_energy,
+        )
+
+    def iter_minima_arrays(
+        self, emax=None, order_energy=False, batch_size=ARRAY_FETCH_SIZE
+    ):
+        """
+        Iterate over the minima in structured numpy arrays of at most 
+        batch_size minima, see minima_arrays.
+
+        Returns
+        -------
+        minima : iterator of numpy arrays
+        """
+        return self._iter_array(
+            Minimum.__table__,
+            self._minima_columns(),
+            MINIMA_ARRAY_DTYPE,
+            emax,
+            order_energy,
+            batch_size,
+        )
+
+    def iter_transition_state_arrays(
+        self, emax=None, order_energy=False, batch_size=ARRAY_FETCH_SIZE
+    ):
+        """
+        Iterate over the transition states in structured numpy arrays of 
+        at most batch_size transition states, see transition_state_arrays.
+
+        Returns
+        -------
+        transition_states : iterator of numpy arrays
+        """
+        return self._iter_array(
+            TransitionState.__table__,
+            self._transition_state_columns(),
+            TRANSITION_STATE_ARRAY_DTYPE,
+            emax,
+            order_energy,
+            batch_size,
+        )
+
+    def energy_summary(self, entity):
+        """
+        Return the number and the lowest and highest energy of the minima 
+        or transition states of the landscape, computed by the database.
+
+        Parameters
+        ----------
+        entity : Minimum or TransitionState
+
+        Returns
+        -------
+        count, energy_min, energy_max :
+            The energies are None if there are no rows.
+        """
+        return (
+            self.session.query(
+                func.count(entity._id),
+                func.min(entity.energy),
+                func.max(entity.energy),
+            )
+            .filter(entity.landscape_id == self.landscape_id)
+            .one()
+        )
+
+    def get_statistics(self):
+        """
+        Return the LandscapeStatistics of the landscape, or None if they 
+        have not been computed.
+        """
+        return self.session.query(LandscapeStatistics).get(self.landscape_id)
 
+    @_cached
     def number_of_minima(self):
         """Return the number of minima in the database."""
-        return self.session.query(Minimum).count()
+        return self.query(Minimum).count()
 
+    @_cached
     def number_of_transition_states(self):
         """Return the number of transition states in the database."""
-        return self.session.query(TransitionState).count()
+        return self.query(TransitionState).count()
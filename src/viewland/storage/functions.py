@@ -0,0 +1,49 @@
+""" SQL functions which are spelled differently by the database backends."""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import Integer
+
+__all__ = ["least", "greatest"]
+
+
+class least(FunctionElement):
+    """
+    The smaller of two values, LEAST(a, b) on PostgreSQL and the scalar
+    MIN(a, b) on SQLite.
+    """
+
+    type = Integer()
+    name = "least"
+    inherit_cache = True
+
+
+class greatest(FunctionElement):
+    """
+    The larger of two values, GREATEST(a, b) on PostgreSQL and the scalar
+    MAX(a, b) on SQLite.
+    """
+
+    type = Integer()
+    name = "greatest"
+    inherit_cache = True
+
+
+@compiles(least)
+def _compile_least(element, compiler, **kw):
+    return "least(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(greatest)
+def _compile_greatest(element, compiler, **kw):
+    return "greatest(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(least, "sqlite")
+def _compile_least_sqlite(element, compiler, **kw):
+    return "min(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(greatest, "sqlite")
+def _compile_greatest_sqlite(element, compiler, **kw):
+    return "max(%s)" % compiler.process(element.clauses, **kw)
@@ -0,0 +1,91 @@
+""" Lightweight minimum and transition state objects without the ORM."""
+
+__all__ = ["MinimumRecord", "TransitionStateRecord"]
+
+
+class MinimumRecord(object):
+    """
+    A minimum which is not backed by the database.
+
+    It behaves like Minimum where the disconnectivity graph is concerned:
+    it has an energy, an id() and compares and hashes by its id.
+
+    Parameters
+    ----------
+    id : int
+        The id of the minimum, i.e. its line number in min.data.
+    energy : float
+    fvib : float, optional
+    pgorder : int, optional
+
+    See Also
+    --------
+    viewland.storage.Minimum
+    """
+
+    __slots__ = ["_id", "energy", "fvib", "pgorder"]
+
+    def __init__(self, id, energy, fvib=None, pgorder=None):
+        self._id = id
+        self.energy = energy
+        self.fvib = fvib
+        self.pgorder = pgorder
+
+    def id(self):
+        """Return the id of the minimum."""
+        return self._id
+
+    def __eq__(self, m):
+        """m can be integer or a minimum object"""
+        if hasattr(m, "id"):
+            return self._id == m.id()
+        return self._id == m
+
+    def __hash__(self):
+        return self._id
+
+    def __repr__(self):
+        return "<MinimumRecord(id='{}', energy='{}')>".format(
+            self._id, self.energy
+        )
+
+
+class TransitionStateRecord(object):
+    """
+    A transition state which is not backed by the database.
+
+    Parameters
+    ----------
+    id : int
+        The id of the transition state, i.e. its line number in ts.data.
+    energy : float
+    minimum1, minimum2 : MinimumRecord
+        The minima connected by the transition state.
+    fvib : float, optional
+    pgorder : int, optional
+
+    See Also
+    --------
+    viewland.storage.TransitionState
+    """
+
+    __slots__ = ["_id", "energy", "minimum1", "minimum2", "fvib", "pgorder"]
+
+    def __init__(
+        self, id, energy, minimum1, minimum2, fvib=None, pgorder=None
+    ):
+        self._id = id
+        self.energy = energy
+        self.minimum1 = minimum1
+        self.minimum2 = minimum2
+        self.fvib = fvib
+        self.pgorder = pgorder
+
+    def id(self):
+        """Return the id of the transition state."""
+        return self._id
+
+    def __repr__(self):
+        return "<TransitionStateRecord(id='{}', energy='{}')>".format(
+            self._id, self.energy
+        )
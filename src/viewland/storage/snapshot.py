@@ -0,0 +1,182 @@
+""" Columnar, memory-mappable snapshots of a landscape."""
+
+import json
+import os
+
+import numpy as np
+
+from .database import Database
+
+__all__ = [
+    "LandscapeSnapshot",
+    "write_snapshot",
+    "database2snapshot",
+]
+
+SNAPSHOT_VERSION = 1
+
+# The columns stored in a snapshot and their types.
+MINIMA_COLUMNS = [
+    ("id", np.int64),
+    ("energy", np.float64),
+    ("fvib", np.float64),
+    ("pgorder", np.int32),
+]
+TRANSITION_STATE_COLUMNS = [
+    ("id", np.int64),
+    ("energy", np.float64),
+    ("fvib", np.float64),
+    ("pgorder", np.int32),
+    ("min1", np.int64),
+    ("min2", np.int64),
+]
+
+# Name of the file describing the snapshot.
+METADATA_FILE = "snapshot.json"
+
+
+def _column_file(path, group, name):
+    return os.path.join(path, "{}.{}.npy".format(group, name))
+
+
+def _write_group(path, group, columns, data):
+    """Write one .npy file per column and return the number of rows."""
+    fields = _fields(data)
+    n = len(data["energy"])
+    for name, dtype in columns:
+        if name == "id" and "id" not in fields:
+            # records are numbered by their line in the PATHSAMPLE file
+            values = np.arange(1, n + 1, dtype=dtype)
+        else:
+            values = np.asarray(data[name], dtype=dtype)
+        if len(values) != n:
+            raise ValueError(
+                "column {} of {} has length {}, expected {}".format(
+                    name, group, len(values), n
+                )
+            )
+        np.save(_column_file(path, group, name), values)
+    return n
+
+
+def _fields(data):
+    """Return the column names of a structured array or a mapping."""
+    names = getattr(getattr(data, "dtype", None), "names", None)
+    if names is not None:
+        return set(names)
+    return set(data.keys())
+
+
+def write_snapshot(path, minima, transition_states):
+    """
+    Write a landscape snapshot.
+
+    Parameters
+    ----------
+    path : str
+        Directory to write the snapshot to, it is created if needed.
+    minima : structured array or dict of arrays
+        With the columns energy, fvib, pgorder and optionally id. Without
+        an id column the minima are numbered from 1, as in min.data.
+    transition_states : structured array or dict of arrays
+        With the columns energy, fvib, pgorder, min1, min2 and optionally
+        id.
+
+    Examples
+    --------
+    Create a snapshot directly from the PATHSAMPLE files:
+
+    >>> from viewland.utils.pathsample import read_min_data, read_ts_data
+    >>> write_snapshot(
+    ...     "landscape", read_min_data("min.data"), read_ts_data("ts.data")
+    ... )
+    """
+    os.makedirs(path, exist_ok=True)
+    nminima = _write_group(path, "minima", MINIMA_COLUMNS, minima)
+    nts = _write_group(
+        path, "transition_states", TRANSITION_STATE_COLUMNS, transition_states
+    )
+    with open(os.path.join(path, METADATA_FILE), "w") as f:
+        json.dump(
+            dict(
+                version=SNAPSHOT_VERSION,
+                number_of_minima=nminima,
+                number_of_transition_states=nts,
+            ),
+            f,
+        )
+
+
+def database2snapshot(db: Database, path):
+    """
+    Write all minima and transition states of the landscape of a database 
+    to a snapshot.
+    """
+    write_snapshot(path, db.minima_arrays(), db.transition_state_arrays())
+
+
+class LandscapeSnapshot(object):
+    """
+    Read a landscape snapshot written by write_snapshot.
+
+    A snapshot is a directory with one .npy file per column, so each column
+    can be memory-mapped and only the data which is used is read from disk.
+
+    Parameters
+    ----------
+    path : str
+        The snapshot directory.
+    mmap : bool, optional
+        Memory-map the columns (default) instead of reading them into
+        memory.
+
+    Attributes
+    ----------
+    minima : dict
+        Maps id, energy, fvib and pgorder to arrays.
+    transition_states : dict
+        Maps id, energy, fvib, pgorder, min1 and min2 to arrays.
+
+    Examples
+    --------
+    >>> from viewland.utils import DisconnectivityGraph
+    >>> snapshot = LandscapeSnapshot("landscape")
+    >>> dg = DisconnectivityGraph(snapshot)
+    >>> dg.calculate()
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        if metadata.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                "unsupported snapshot version {}".format(
+                    metadata.get("version")
+                )
+            )
+        mmap_mode = "r" if mmap else None
+        self.minima = {
+            name: np.load(
+                _column_file(path, "minima", name), mmap_mode=mmap_mode
+            )
+            for name, _ in MINIMA_COLUMNS
+        }
+        self.transition_states = {
+            name: np.load(
+                _column_file(path, "transition_states", name),
+                mmap_mode=mmap_mode,
+            )
+            for name, _ in TRANSITION_STATE_COLUMNS
+        }
+
+    def number_of_minima(self):
+        """Return the number of minima in the snapshot."""
+        return len(self.minima["id"])
+
+    def number_of_transition_states(self):
+        """Return the number of transition states in the snapshot."""
+        return len(self.transition_states["id"])
+
+    def __repr__(self):
+        return "<LandscapeSnapshot(path='{}')>".format(self.path)
@@ -0,0 +1,97 @@
+""" Column types for storing numpy arrays in the database."""
+
+import pickle
+import struct
+
+import numpy as np
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+__all__ = ["ArrayType", "encode_array", "decode_array", "is_encoded_array"]
+
+# The first bytes of every encoded array.  Values without this prefix are
+# legacy pickles written by PickleType.
+MAGIC = b"VLA1"
+
+# Data starts at a multiple of this many bytes, so that decoded arrays are
+# aligned for every numeric dtype.
+ALIGNMENT = 8
+
+
+def is_encoded_array(data):
+    """Return True if data was written by encode_array."""
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def encode_array(array):
+    """
+    Encode a numpy array as raw little-endian bytes behind a small header.
+
+    The header holds the magic bytes, the dtype string (e.g. "<f8") and the
+    shape, padded so the data is aligned to ALIGNMENT bytes.
+    """
+    array = np.asarray(array)
+    if array.dtype.hasobject or array.dtype.names is not None:
+        raise ValueError(
+            "only plain numeric arrays can be stored, got {}".format(
+                array.dtype
+            )
+        )
+    array = np.asarray(array, dtype=array.dtype.newbyteorder("<"), order="C")
+    dtype = array.dtype.str.encode("ascii")
+    header = MAGIC + struct.pack(
+        "<B%dsB%dQ" % (len(dtype), array.ndim),
+        len(dtype),
+        dtype,
+        array.ndim,
+        *array.shape
+    )
+    header += b"\0" * (-len(header) % ALIGNMENT)
+    return header + array.tobytes()
+
+
+def decode_array(data):
+    """
+    Decode bytes written by encode_array without copying the data.
+
+    The returned array is read-only since it shares memory with data.
+    Legacy pickled values are unpickled instead.
+    """
+    if not is_encoded_array(data):
+        return pickle.loads(data)
+    offset = len(MAGIC)
+    (dtype_len,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    dtype = bytes(data[offset : offset + dtype_len]).decode("ascii")
+    offset += dtype_len
+    (ndim,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    shape = struct.unpack_from("<%dQ" % ndim, data, offset)
+    offset += 8 * ndim
+    offset += -offset % ALIGNMENT
+    count = int(np.prod(shape, dtype=np.int64))
+    array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+    return np.reshape(array, shape)
+
+
+class ArrayType(TypeDecorator):
+    """
+    Stores numpy arrays as raw little-endian bytes in a binary column.
+
+    Unlike PickleType the stored bytes can be read outside of Python, and
+    reading is a zero-copy numpy.frombuffer.  Values written by PickleType
+    are still read correctly, see Database.migrate_pickled_arrays.
+    """
+
+    impl = LargeBinary
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_array(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_array(value)
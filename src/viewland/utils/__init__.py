@@ -1,3 +1,7 @@
 from .converter import *
 from .disconnectivity_graph import *
+from .graph_backends import *
+from .landscape_graph import *
+from .pathsample import *
+from .statistics import *
 from .wrapper import *
@@ -1,8 +1,119 @@
+from contextlib import contextmanager
+import hashlib
+import os
+
 import numpy as np
-from viewland.storage import Minimum, TransitionState, Database
+from sqlalchemy import and_
+from viewland.storage import (
+    Minimum,
+    TransitionState,
+    ImportCheckpoint,
+    LandscapeStatistics,
+    Database,
+)
+from viewland.storage.bulk import bulk_insert, deferred_indexes, analyze
+from viewland.storage.engine import bulk_loading
+from .pathsample import (
+    MIN_DTYPE,
+    TS_DTYPE,
+    iter_min_data,
+    iter_ts_data,
+    iter_byte_ranges,
+    open_source,
+    is_compressed,
+    ParseError,
+)
+from .statistics import stream_landscape_statistics
 
 __all__ = ["Converter"]
 
+# Names under which the import checkpoints of the files are recorded.
+MIN_SOURCE = "min.data"
+TS_SOURCE = "ts.data"
+
+# Number of bytes read at a time when hashing a file.
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _hash_prefix(path, nbytes):
+    """
+    Return a sha256 object updated with the first nbytes of a file, or None
+    if the file is shorter. Compressed files are hashed after decompression.
+    """
+    hasher = hashlib.sha256()
+    remaining = nbytes
+    with open_source(path) as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, HASH_BLOCK_SIZE))
+            if len(chunk) == 0:
+                return None
+            hasher.update(chunk)
+            remaining -= len(chunk)
+    return hasher
+
+
+def _skip(f, nbytes):
+    """
+    Move the freshly opened binary file f to offset nbytes, also if it is
+    not seekable.
+    """
+    if f.seekable():
+        f.seek(nbytes)
+        return
+    while nbytes > 0:
+        chunk = f.read(min(nbytes, HASH_BLOCK_SIZE))
+        if len(chunk) == 0:
+            return
+        nbytes -= len(chunk)
+
+
+def _complete_size(path):
+    """
+    Return the size of the uncompressed file path without an incomplete 
+    last line, i.e. the offset after its last newline.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            begin = max(0, end - HASH_BLOCK_SIZE)
+            f.seek(begin)
+            newline = f.read(end - begin).rfind(b"\n")
+            if newline >= 0:
+                return begin + newline + 1
+            end = begin
+    return 0
+
+
+class _SourceState(object):
+    """
+    Tracks the byte offset, the number of records and the hash of the part
+    of a source file which has been imported.
+    """
+
+    def __init__(self, offset=0, nlines=0, hasher=None):
+        self.offset = offset
+        self.nlines = nlines
+        self.hasher = hashlib.sha256() if hasher is None else hasher
+        # whether an incomplete last line was left for a later import
+        self.partial = False
+
+    def lines(self, f):
+        """
+        Iterate over the lines of the binary file f from its current 
+        position, updating the offset and the hash as lines are consumed.
+
+        A last line without a newline is still being written, e.g. by 
+        PATHSAMPLE, so it is not consumed.
+        """
+        for line in f:
+            if not line.endswith(b"\n"):
+                self.partial = True
+                return
+            self.offset += len(line)
+            self.hasher.update(line)
+            yield line.decode()
+
 
 class Converter(object):
     """
@@ -19,6 +130,19 @@ class Converter(object):
     tsdata : str, optional
         Path to min.ts which is a file that contains information about 
         transition states (like which minima they connect).
+        Both files may be gzip, bz2, xz or zstd compressed; they are then
+        decompressed as a stream while parsing.
+    method : str, optional
+        How the rows are written to the database, see 
+        viewland.storage.bulk.bulk_insert. The default "auto" streams the 
+        rows with COPY on PostgreSQL and uses INSERT on other backends.
+    batch_size : int, optional
+        The number of lines which are parsed, validated and inserted at a
+        time. This bounds the memory used by the conversion.
+    nprocs : int, optional
+        If larger than 1, the files are split into byte ranges which are 
+        parsed by a pool of nprocs processes. The records are still inserted
+        in file order, since the ids of the minima are their line numbers.
 
     Attributes
     ----------
@@ -30,82 +154,424 @@ class Converter(object):
     tsdata : str
         Path to min.ts which is a file that contains information about 
         transition states (like which minima they connect). 
+    method : str
+        How the rows are written to the database.
+    batch_size : int
+        The number of lines which are parsed and inserted at a time.
+    nprocs : int or None
+        The number of processes used for parsing.
+    nminima : int or None
+        The number of minima in the database, used to validate the minimum
+        ids in ts.data.
+
+    Notes
+    -----
+    Coordinates are not read, so the coords columns are left empty. The
+    data is imported into the landscape of the database, the ids of the 
+    minima and transition states are their line numbers.
+
+    After the import, global statistics of the landscape are stored as 
+    LandscapeStatistics, see compute_statistics. An incremental import 
+    which adds no lines keeps the stored statistics.
+
+    After each file is read, an ImportCheckpoint with its byte offset, line 
+    count and the hash of the imported part is stored in the database. 
+    This allows a later convert_no_coords(incremental=True) to import only 
+    the lines which PATHSAMPLE appended in the meantime.
 
     """
 
     def __init__(
-        self, database: Database, mindata="min.data", tsdata="ts.data"
+        self,
+        database: Database,
+        mindata="min.data",
+        tsdata="ts.data",
+        method="auto",
+        batch_size=100000,
+        nprocs=None,
     ):
         self.db = database
         self.mindata = mindata
         self.tsdata = tsdata
+        self.method = method
+        self.batch_size = batch_size
+        self.nprocs = nprocs
+        self.nminima = None
         return
 
-    def read_min_data(self):
-        """Read min.data file."""
+    def _validate_minima(self, minima, first_line):
+        """Check a block of minima read from min.data."""
+        bad = np.flatnonzero(~np.isfinite(minima["energy"]))
+        if len(bad) > 0:
+            raise ValueError(
+                "{}: invalid energy on line {}".format(
+                    self.mindata, first_line + bad[0]
+                )
+            )
+
+    def _validate_transition_states(self, transition_states, first_line):
+        """Check a block of transition states read from ts.data."""
+        bad = np.flatnonzero(~np.isfinite(transition_states["energy"]))
+        if len(bad) > 0:
+            raise ValueError(
+                "{}: invalid energy on line {}".format(
+                    self.tsdata, first_line + bad[0]
+                )
+            )
+        ids = np.column_stack(
+            [transition_states["min1"], transition_states["min2"]]
+        )
+        bad = np.flatnonzero(((ids < 1) | (ids > self.nminima)).any(axis=1))
+        if len(bad) > 0:
+            raise ValueError(
+                "{}: unknown minimum on line {}".format(
+                    self.tsdata, first_line + bad[0]
+                )
+            )
 
-        print("reading from", self.mindata)
-        # record how many minima are read in.
-        indx = 0
-        minima_dicts = []
-        for line in open(self.mindata, "r"):
-            sline = line.split()
-            coords = np.zeros(1)
-
-            # read data from the min.data line
-            # energy and vibrational free energy
-            e, fvib = list(map(float, sline[:2]))
-            # point group order
-            pg = int(sline[2])
-
-            # create the minimum object and attach the data
-            min_dict = dict(
-                energy=e, coords=coords, invalid=0, fvib=fvib, pgorder=pg
+    def _checkpoint(self, source):
+        """Return the ImportCheckpoint of source in the landscape."""
+        return self.db.session.query(ImportCheckpoint).get(
+            (self.db.landscape_id, source)
+        )
+
+    def _defer_indexes(self, table, state):
+        """
+        Return the tables whose indexes are rebuilt after the import: only
+        when loading into an empty landscape which is the only one in the 
+        database, since other landscapes share the indexes.
+        """
+        if state.nlines == 0 and len(self.db.landscapes()) == 1:
+            return [table]
+        return []
+
+    def _resume(self, source, path):
+        """
+        Return the state after the last import of path, or None if there 
+        is no checkpoint or the already imported part of the file changed.
+        """
+        checkpoint = self._checkpoint(source)
+        if checkpoint is None:
+            return None
+        # offsets refer to the decompressed content of compressed files
+        size = os.path.getsize(path)
+        if not is_compressed(path) and size < checkpoint.offset:
+            return None
+
+        # hash the prefix of the file which has been imported already
+        hasher = _hash_prefix(path, checkpoint.offset)
+        if hasher is None or hasher.hexdigest() != checkpoint.digest:
+            return None
+        return _SourceState(checkpoint.offset, checkpoint.nlines, hasher)
+
+    def _is_unchanged(self, source, path):
+        """Return True if path is identical to the file last imported."""
+        checkpoint = self._checkpoint(source)
+        if checkpoint is None:
+            return False
+        stat = os.stat(path)
+        compressed = is_compressed(path)
+        if not compressed and stat.st_size != checkpoint.offset:
+            return False
+        # trust the modification time of the same file, otherwise compare
+        # the content.
+        if (
+            checkpoint.path == path
+            and checkpoint.mtime_ns is not None
+            and checkpoint.mtime_ns == stat.st_mtime_ns
+        ):
+            return True
+        if compressed:
+            # hash the whole decompressed content
+            hasher = _hash_prefix(path, checkpoint.offset)
+            with open_source(path) as f:
+                _skip(f, checkpoint.offset)
+                if hasher is None or len(f.read(1)) > 0:
+                    return False
+            return hasher.hexdigest() == checkpoint.digest
+        hasher = _hash_prefix(path, stat.st_size)
+        return hasher is not None and hasher.hexdigest() == checkpoint.digest
+
+    def is_up_to_date(self):
+        """
+        Return True if the database already holds exactly the content of 
+        min.data and ts.data, so that they do not need to be imported again.
+
+        The files are compared with the fingerprints (size, modification 
+        time and SHA-256 hash) recorded by the last import.
+        """
+        return self._is_unchanged(
+            MIN_SOURCE, self.mindata
+        ) and self._is_unchanged(TS_SOURCE, self.tsdata)
+
+    def _save_checkpoint(self, source, path, state):
+        """Record how much of path has been imported."""
+        stat = os.stat(path)
+        # compressed files are read to the end or to an incomplete line
+        complete = not state.partial and (
+            is_compressed(path) or stat.st_size == state.offset
+        )
+        self.db.session.merge(
+            ImportCheckpoint(
+                self.db.landscape_id,
+                source,
+                path,
+                state.offset,
+                state.nlines,
+                state.hasher.hexdigest(),
+                mtime_ns=stat.st_mtime_ns if complete else None,
             )
-            minima_dicts.append(min_dict)
+        )
 
-            indx += 1
+    @contextmanager
+    def _discard_on_error(self, table, nlines):
+        """
+        Delete the rows of table in the landscape after the first nlines if
+        the block raises, so that an import which fails partway through,
+        e.g. on an invalid line, does not leave the batches written so far
+        behind.
+        """
+        try:
+            yield
+        except BaseException:
+            with self.db.engine.begin() as connection:
+                connection.execute(
+                    table.delete().where(
+                        and_(
+                            table.c.landscape_id == self.db.landscape_id,
+                            table.c._id > nlines,
+                        )
+                    )
+                )
+            self.db.bump_version()
+            raise
 
-        self.db.engine.execute(Minimum.__table__.insert(), minima_dicts)
-        self.db.session.commit()
+    def _batches(self, path, f, state, iter_data, dtype):
+        """
+        Yield blocks of at most self.batch_size records parsed from the 
+        binary file f opened from path, starting after the part described 
+        by state. Compressed files are always parsed serially. An 
+        incomplete last line is left out, see _SourceState.lines .
+
+        Raises
+        ------
+        ValueError
+            With the number of the line in the file, if a line is empty or
+            a comment.
+        """
+        try:
+            _skip(f, state.offset)
+            if (
+                self.nprocs is None
+                or self.nprocs <= 1
+                or is_compressed(path)
+            ):
+                yield from iter_data(state.lines(f), self.batch_size)
+                return
+            stop = _complete_size(path)
+            state.partial = stop < os.path.getsize(path)
+            for begin, end, records in iter_byte_ranges(
+                path, dtype, self.nprocs, start=state.offset, stop=stop
+            ):
+                state.hasher.update(f.read(end - begin))
+                state.offset = end
+                for i in range(0, len(records), self.batch_size):
+                    yield records[i : i + self.batch_size]
+        except ParseError as error:
+            # the lines are counted from the first line not yet imported
+            raise ValueError(
+                "{}: {} line {}".format(
+                    path, error.message, state.nlines + error.line
+                )
+            ) from None
 
+    def read_min_data(self, state=None):
+        """
+        Read min.data file in batches of self.batch_size lines.
+
+        Parameters
+        ----------
+        state : optional
+            Resume the import after the lines described by this state, see 
+            convert_no_coords(incremental=True).
+
+        Returns
+        -------
+        nminima : int
+            The number of minima read in.
+        """
+
+        print("reading from", self.mindata)
+        if state is None:
+            state = _SourceState()
+        table = Minimum.__table__
+        deferred = self._defer_indexes(table, state)
+        # record how many minima are read in.
+        indx = state.nlines
+        with self._discard_on_error(table, indx), open_source(
+            self.mindata
+        ) as f, bulk_loading(self.db.engine), deferred_indexes(
+            self.db.engine, deferred
+        ):
+            for minima in self._batches(
+                self.mindata, f, state, iter_min_data, MIN_DTYPE
+            ):
+                self._validate_minima(minima, indx + 1)
+                bulk_insert(
+                    self.db.engine,
+                    table,
+                    dict(
+                        landscape_id=np.full(
+                            len(minima), self.db.landscape_id
+                        ),
+                        _id=np.arange(indx + 1, indx + len(minima) + 1),
+                        energy=minima["energy"],
+                        fvib=minima["fvib"],
+                        pgorder=minima["pgorder"],
+                        invalid=np.zeros(len(minima), dtype=int),
+                    ),
+                    method=self.method,
+                )
+                indx += len(minima)
+                print("--->loaded %s minima" % indx)
+        analyze(self.db.engine, [table])
+        state.nlines = indx
+        self._save_checkpoint(MIN_SOURCE, self.mindata, state)
+        self.db.bump_version()
+
+        self.nminima = indx
         print("--->finished loading %s minima" % indx)
+        return indx
+
+    def read_ts_data(self, state=None):
+        """
+        Read ts.data file in batches of self.batch_size lines.
 
-    def read_ts_data(self):
-        """read ts.data file """
+        Parameters
+        ----------
+        state : optional
+            Resume the import after the lines described by this state, see 
+            convert_no_coords(incremental=True).
+
+        Returns
+        -------
+        nts : int
+            The number of transition states read in.
+        """
         print("reading from", self.tsdata)
+        if state is None:
+            state = _SourceState()
+        if self.nminima is None:
+            self.nminima = self.db.number_of_minima()
 
+        table = TransitionState.__table__
+        deferred = self._defer_indexes(table, state)
         # record how many transition states are read in.
-        indx = 0
-        ts_dicts = []
-        for line in open(self.tsdata, "r"):
-            sline = line.split()
-            coords = np.zeros(1)
-
-            # read data from the min.ts line
-            e, fvib = list(map(float, sline[:2]))  # get energy and fvib
-            pg = int(sline[2])  # point group order
-            m1indx, m2indx = list(map(int, sline[3:5]))
-
-            tsdict = dict(
-                energy=e,
-                coords=coords,
-                invalid=0,
-                fvib=fvib,
-                pgorder=pg,
-                _minimum1_id=m1indx,
-                _minimum2_id=m2indx,
-            )
-            ts_dicts.append(tsdict)
+        indx = state.nlines
+        with self._discard_on_error(table, indx), open_source(
+            self.tsdata
+        ) as f, bulk_loading(self.db.engine), deferred_indexes(
+            self.db.engine, deferred
+        ):
+            for transition_states in self._batches(
+                self.tsdata, f, state, iter_ts_data, TS_DTYPE
+            ):
+                self._validate_transition_states(transition_states, indx + 1)
+                bulk_insert(
+                    self.db.engine,
+                    table,
+                    dict(
+                        landscape_id=np.full(
+                            len(transition_states), self.db.landscape_id
+                        ),
+                        _id=np.arange(
+                            indx + 1, indx + len(transition_states) + 1
+                        ),
+                        energy=transition_states["energy"],
+                        fvib=transition_states["fvib"],
+                        pgorder=transition_states["pgorder"],
+                        invalid=np.zeros(len(transition_states), dtype=int),
+                        _minimum1_id=transition_states["min1"],
+                        _minimum2_id=transition_states["min2"],
+                    ),
+                    method=self.method,
+                )
+                indx += len(transition_states)
+                print("--->loaded %s transition states" % indx)
+        analyze(self.db.engine, [table])
+        state.nlines = indx
+        self._save_checkpoint(TS_SOURCE, self.tsdata, state)
+        self.db.bump_version()
+
+        print("--->finished loading %s transition states" % indx)
+        return indx
+
+    def compute_statistics(self):
+        """
+        Compute the LandscapeStatistics of the imported data and store 
+        them in the database.
 
-            indx += 1
+        The rows are streamed from the database in batches of 
+        self.batch_size, so only the ids and energies of the minima and 
+        one batch of transition states are held in memory.
 
-        self.db.engine.execute(TransitionState.__table__.insert(), ts_dicts)
+        Returns
+        -------
+        statistics : LandscapeStatistics
+        """
+        # the counts and the range of the energies come from the database,
+        # the rest is computed from the rows streamed in energy order.
+        nts, ts_energy_min, ts_energy_max = self.db.energy_summary(
+            TransitionState
+        )
+        statistics = stream_landscape_statistics(
+            self.db.iter_minima_arrays(
+                order_energy=True, batch_size=self.batch_size
+            ),
+            self.db.iter_transition_state_arrays(
+                order_energy=True, batch_size=self.batch_size
+            ),
+            nts,
+            ts_energy_range=(ts_energy_min, ts_energy_max),
+        )
+        statistics = self.db.session.merge(
+            LandscapeStatistics(self.db.landscape_id, **statistics)
+        )
         self.db.session.commit()
+        print(
+            "--->%s connected components, %s self-connected transition states"
+            % (statistics.ncomponents, statistics.nself_connected)
+        )
+        return statistics
 
-        print("--->finished loading %s transition states" % indx)
+    def convert_no_coords(self, incremental=False):
+        """
+        Convert pathsample database without loading coordinates.
 
-    def convert_no_coords(self):
-        """Convert pathsample database without loading coordinates."""
-        self.read_min_data()
-        self.read_ts_data()
+        Parameters
+        ----------
+        incremental : bool, optional
+            Only import the lines which were appended to min.data and 
+            ts.data since the last import into the database. If there is
+            no previous import, or the already imported part of either file
+            has changed, all data is removed and both files are reloaded.
+            Otherwise, the default, the data of the landscape is always 
+            replaced by the content of the files.
+        """
+        min_state = ts_state = None
+        if incremental:
+            min_state = self._resume(MIN_SOURCE, self.mindata)
+            ts_state = self._resume(TS_SOURCE, self.tsdata)
+            if min_state is None or ts_state is None:
+                print("no matching previous import, reloading all data")
+                min_state = ts_state = None
+        if min_state is None or ts_state is None:
+            self.db.reset()
+            previous = None
+        else:
+            previous = (min_state.nlines, ts_state.nlines)
+        nminima = self.read_min_data(min_state)
+        nts = self.read_ts_data(ts_state)
+        # nothing was appended, the statistics are still valid
+        if (nminima, nts) != previous or self.db.get_statistics() is None:
+            self.compute_statistics()
@@ -5,48 +5,136 @@ import numpy as np
 import networkx as nx
 
 from viewland.storage.database import Minimum, TransitionState, Database
+from viewland.storage.snapshot import LandscapeSnapshot
 
-__all__ = ["DisconnectivityGraph", "database2graph"]
+from .graph_backends import make_graph_backend
+from .landscape_graph import LandscapeGraph, deduplicate_transition_states
 
+__all__ = [
+    "DisconnectivityGraph",
+    "database2graph",
+    "snapshot2graph",
+    "arrays2graph",
+]
 
-def database2graph(db: Database, Emax: float = None):
+
+def database2graph(db: Database, Emax: float = None, records: bool = False):
     """
     Make a networkx graph from a database.
 
     Parameters
     ----------
-    db : viewland Database
+    db : viewland Database or LandscapeSnapshot
     Emax : float optional
         Including only transition states with energy < Emax.
+    records : bool, optional
+        By default the nodes are Minimum objects and the "ts" edge 
+        attributes TransitionState objects of the database. If True, the 
+        ids, energies and minima of the transition states are read with 
+        Database.minima_arrays and Database.transition_state_arrays 
+        instead, and the nodes are MinimumRecord and the transition states
+        TransitionStateRecord objects. This is much faster for large 
+        landscapes, but the records have no coordinates or relationships.
+        A LandscapeSnapshot always gives records.
+
+    Notes
+    -----
+    Of the transition states between the same minima only the lowest is an
+    edge. Self-connected transition states are edges from a minimum to 
+    itself, they count for the default energy levels of a 
+    DisconnectivityGraph but not for its tree. A LandscapeGraph drops them
+    by default, see LandscapeGraph.from_arrays .
+
+    See Also
+    --------
+    LandscapeGraph.from_database :
+        The graph as compact arrays, without objects per minimum and 
+        transition state.
     """
+    if isinstance(db, LandscapeSnapshot):
+        return snapshot2graph(db, Emax=Emax)
+    if records:
+        # Emax is applied by the database
+        return arrays2graph(
+            db.minima_arrays(emax=Emax),
+            db.transition_state_arrays(emax=Emax),
+        )
 
     g = nx.Graph()
 
     # include only transition states with energy < Emax
     if Emax is not None:
-        minima = db.session.query(Minimum).filter(Minimum.energy <= Emax)
+        minima = db.query(Minimum).filter(Minimum.energy <= Emax)
     else:
-        minima = db.session.query(Minimum)
-    g.add_nodes_from(minima)
+        minima = db.query(Minimum)
+    id_to_minimum = {m.id(): m for m in minima}
+    g.add_nodes_from(id_to_minimum.values())
 
-    # If we order by energy first and add the transition states with the
-    # largest energy first, then we will take the smallest energy
-    # transition state in the case of duplicates.
+    ts = db.query(TransitionState)
     if Emax is not None:
-        ts = (
-            db.session.query(TransitionState)
-            .filter(TransitionState.energy <= Emax)
-            .order_by(-TransitionState.energy)
-        )
-    else:
-        ts = db.session.query(TransitionState).order_by(
-            -TransitionState.energy
+        ts = ts.filter(TransitionState.energy <= Emax)
+    ts = [
+        t
+        for t in ts
+        if t._minimum1_id in id_to_minimum and t._minimum2_id in id_to_minimum
+    ]
+    # keep the lowest transition state between each pair of minima, also
+    # of a minimum and itself, self-connected ones are dropped by make_tree
+    keep, _, _ = deduplicate_transition_states(
+        np.array([t._minimum1_id for t in ts], dtype=np.int64),
+        np.array([t._minimum2_id for t in ts], dtype=np.int64),
+        np.array([t.energy for t in ts], dtype=np.float64),
+        keep_self_connected=True,
+    )
+    for i in keep.tolist():
+        t = ts[i]
+        g.add_edge(
+            id_to_minimum[t._minimum1_id], id_to_minimum[t._minimum2_id], ts=t
         )
-    for t in ts:
-        g.add_edge(t.minimum1, t.minimum2, ts=t)
     return g
 
 
+def snapshot2graph(snapshot: LandscapeSnapshot, Emax: float = None):
+    """
+    Make a networkx graph from a landscape snapshot, without a database.
+
+    The nodes are MinimumRecord and the transition states are
+    TransitionStateRecord objects.
+
+    Parameters
+    ----------
+    snapshot : viewland LandscapeSnapshot
+    Emax : float optional
+        Including only transition states with energy < Emax.
+    """
+    return arrays2graph(
+        snapshot.minima, snapshot.transition_states, Emax=Emax
+    )
+
+
+def arrays2graph(minima, transition_states, Emax: float = None):
+    """
+    Make a networkx graph from arrays of minima and transition states.
+
+    The nodes are MinimumRecord and the transition states are
+    TransitionStateRecord objects.
+
+    Parameters
+    ----------
+    minima : structured array or dict of arrays
+        With the fields id, energy, fvib and pgorder, e.g. from 
+        Database.minima_arrays .
+    transition_states : structured array or dict of arrays
+        With the fields id, energy, fvib, pgorder, min1 and min2, e.g. from
+        Database.transition_state_arrays .
+    Emax : float optional
+        Including only transition states with energy < Emax.
+    """
+    return LandscapeGraph.from_arrays(
+        minima, transition_states, Emax=Emax, keep_self_connected=True
+    ).to_networkx()
+
+
 class TreeLeastCommonAncestor(object):
     """Find the least common ancestor to a set of trees."""
 
@@ -284,13 +372,18 @@ class _MakeTree(object):
     def make_tree(self):
         """Make the disconnectivity tree."""
         # make list of transition states sorted so that lower energies are to the right
-        tslist = [
-            ts for ts in self.transition_states if ts.minimum1 != ts.minimum2
-        ]
-        # remove duplicate entries and sort
-        tslist = list(set(tslist))
-        tslist.sort(key=lambda ts: -self.get_energy(ts))
-        self.transition_states = tslist
+        tslist = list(self.transition_states)
+        energies = np.array(
+            [self.get_energy(ts) for ts in tslist], dtype=float
+        )
+        # remove self-connected and duplicate transition states and sort
+        keep, _, _ = deduplicate_transition_states(
+            np.array([ts.minimum1.id() for ts in tslist], dtype=np.int64),
+            np.array([ts.minimum2.id() for ts in tslist], dtype=np.int64),
+            energies,
+        )
+        keep = keep[np.argsort(-energies[keep], kind="stable")]
+        self.transition_states = [tslist[i] for i in keep.tolist()]
 
         trees = []
 
@@ -595,7 +688,7 @@ class DisconnectivityGraph(object):
     
     Parameters
     ----------
-    graph : a networkx graph
+    graph : a networkx graph, a LandscapeGraph or a LandscapeSnapshot
         A graph with Minimum objects as nodes and transition
         states defining the edges.  You can use the function
         database2graph() defined in this module to create this 
@@ -604,6 +697,11 @@ class DisconnectivityGraph(object):
         >>> from viewland.utils.disconnectivity_graph import database2graph
         >>> graph = database2graph(database)
         >>> dg = DisconnectivityGraph(graph)
+
+        A LandscapeSnapshot or a Database is converted with 
+        LandscapeGraph.from_snapshot() or LandscapeGraph.from_database(), 
+        applying Emax while the graph is built.  For a Database, Emax is 
+        applied by the database query.
          
     nlevels : int
         The number of levels at which to bin the transition states.
@@ -645,6 +743,20 @@ class DisconnectivityGraph(object):
         sorted by this value with small values to the left.  
         A group of minima will be sorted according to the 
         smallest value in the group.  
+    backend : str, optional
+        The implementation of the graph operations, see 
+        graph_backends.make_graph_backend.  "networkx" works on a 
+        networkx graph, "arrays" on the numpy arrays of a LandscapeGraph 
+        with scipy.sparse for the connected components.  The default 
+        "auto" uses "arrays" for large LandscapeGraphs and "networkx" 
+        otherwise.
+    statistics : LandscapeStatistics, optional
+        Precomputed statistics of the landscape, see 
+        Database.get_statistics.  If they describe the graph which is 
+        drawn, i.e. every minimum and transition state of the landscape 
+        is in it, the default energy levels are taken from the stored 
+        range of transition state energies instead of scanning the edges.
+        The levels are the same either way.
     
     See Also
     ---------
@@ -678,8 +790,15 @@ class DisconnectivityGraph(object):
         include_gmin=True,
         energy_attribute="energy",
         order_by_value=None,
+        backend="auto",
+        statistics=None,
     ):
+        if isinstance(graph, LandscapeSnapshot):
+            graph = LandscapeGraph.from_snapshot(graph, Emax=Emax)
+        elif isinstance(graph, Database):
+            graph = LandscapeGraph.from_database(graph, Emax=Emax)
         self.graph = graph
+        self.backend = make_graph_backend(graph, backend, energy_attribute)
         self.nlevels = nlevels
         self.Emax = Emax
         self.subgraph_size = subgraph_size
@@ -690,6 +809,7 @@ class DisconnectivityGraph(object):
         self.energy_attribute = energy_attribute
         self.node_offset = node_offset
         self.get_value = order_by_value
+        self.statistics = statistics
         if self.center_gmin:
             include_gmin = True
 
@@ -698,12 +818,10 @@ class DisconnectivityGraph(object):
         self.min0list = minima
         if include_gmin:
             # find the minimum energy node
-            elist = [(self._getEnergy(m), m) for m in self.graph.nodes()]
-            elist = sorted(elist)
-            self.gmin0 = elist[0][1]
+            energies = self.backend.node_energies()
+            self.gmin0 = self.backend.nodes([np.argmin(energies)])[0]
             self.min0list.append(self.gmin0)
         # print("min0", self.min0.energy, self.min0.id())
-        self.transition_states = nx.get_edge_attributes(self.graph, "ts")
         self.tree_list = [[] for _ in range(self.nlevels)]
 
     def _getEnergy(self, node):
@@ -714,16 +832,9 @@ class DisconnectivityGraph(object):
         """ Manually set the energy levels. """
         self.elevels = elevels
 
-    def _getTS(self, min1, min2):
-        """Return the transition state object between two minima."""
-        try:
-            return self.transition_states[(min1, min2)]
-        except KeyError:
-            return self.transition_states[(min2, min1)]
-
-    def _make_tree(self, graph: nx.Graph, energy_levels):
+    def _make_tree(self, graph, energy_levels):
         """Make the disconnectivity graph tree."""
-        transition_states = list(nx.get_edge_attributes(graph, "ts").values())
+        transition_states = graph.transition_states()
         minima = graph.nodes()
         maketree = _MakeTree(
             minima,
@@ -972,14 +1083,16 @@ class DisconnectivityGraph(object):
     # disconnectivity graph
     ##########################################################################
 
-    def _remove_nodes_with_few_edges(self, graph: nx.Graph, nmin: int):
-        rmlist = [n for n in graph.nodes() if graph.degree(n) < nmin]
+    def _remove_nodes_with_few_edges(self, graph, nmin: int):
+        degrees = graph.degrees()
+        rmlist = np.flatnonzero(degrees < nmin)
         if len(rmlist) > 0:
             if self.gmin0 is not None:
-                if self.gmin0 in rmlist:
+                igmin = graph.index(self.gmin0)
+                if igmin in rmlist:
                     print(
                         "global minimum has",
-                        graph.degree(self.gmin0),
+                        degrees[igmin],
                         "edges, not showing in graph",
                     )
             print(
@@ -989,65 +1102,59 @@ class DisconnectivityGraph(object):
                 nmin,
                 "edges",
             )
-            for n in rmlist:
-                graph.remove_node(n)
-        return graph
-
-    def _remove_high_energy_minima(self, graph, emax):
-        if emax is None:
-            return graph
-        rmlist = [m for m in graph.nodes() if self._getEnergy(m) > emax]
-        if len(rmlist) > 0:
-            print(
-                "removing %d nodes with energy higher than" % len(rmlist), emax
-            )
-        for m in rmlist:
-            graph.remove_node(m)
+            graph = graph.remove_nodes(rmlist)
         return graph
 
-    def _remove_high_energy_transitions(self, graph, emax):
+    def _remove_high_energy(self, graph, emax):
+        """
+        Remove the minima and transition states with energy above emax, 
+        with boolean masks over their energies.
+        """
         if emax is None:
             return graph
-        rmlist = [
-            edge
-            for edge in graph.edges()
-            if self._getEnergy(self._getTS(edge[0], edge[1])) > emax
-        ]
-        if len(rmlist) > 0:
+        nodes = graph.node_energies() > emax
+        edges = graph.edge_energies() > emax
+        if nodes.any():
             print(
-                "removing %d edges with energy higher than" % len(rmlist), emax
+                "removing %d nodes with energy higher than" % nodes.sum(), emax
             )
-        for edge in rmlist:
-            graph.remove_edge(edge[0], edge[1])
+        nedges = edges.sum()
+        if nedges > 0 and nodes.any():
+            # count only the edges which are not removed with their minima
+            i1, i2 = graph.edge_nodes()
+            nedges = (edges & ~(nodes[i1] | nodes[i2])).sum()
+        if nedges > 0:
+            print("removing %d edges with energy higher than" % nedges, emax)
+        if nodes.any() or edges.any():
+            graph = graph.subgraph(~nodes, ~edges)
         return graph
 
-    def _reduce_graph(self, graph: nx.Graph, min0list):
+    def _reduce_graph(self, graph, min0list):
         """
         Determine how much of the graph to include in the disconnectivity 
         graph.
+
+        The connected components are labelled once, and the minima to 
+        keep are selected with a mask over the labels.
         """
-        used_nodes = []
+        labels = graph.component_labels()
+        sizes = np.bincount(labels)
+        used = np.zeros(len(sizes), dtype=bool)
         # make sure we include the subgraph containing min0
-        if len(min0list) > 0:
-            for min0 in min0list:
-                nodes = nx.node_connected_component(graph, min0)
-                if len(nodes) > 2:
-                    used_nodes += nodes
-                else:
-                    print("dgraph: too few nodes connected to", min0)
-        if len(used_nodes) == 0:
+        for min0 in min0list:
+            i = graph.index(min0)
+            if i >= 0 and sizes[labels[i]] > 2:
+                used[labels[i]] = True
+            else:
+                print("dgraph: too few nodes connected to", min0)
+        if not used.any():
             # use the biggest connected cluster
-            cc = sorted(nx.connected_components(graph), key=len, reverse=True)
-            used_nodes += cc[0]  # list is ordered by size of cluster
+            used[np.argmax(sizes)] = True
 
         if self.subgraph_size is not None:
-            node_lists = nx.connected_components(graph)
-            for nodes in node_lists:
-                if len(nodes) >= self.subgraph_size:
-                    used_nodes += nodes
+            used |= sizes >= self.subgraph_size
 
-        newgraph = graph.subgraph(used_nodes).copy()
-        return newgraph
+        return graph.subgraph(used[labels])
 
     ##########################################################################
     # general functions
@@ -1084,15 +1191,41 @@ class DisconnectivityGraph(object):
         if hasattr(self, "elevels"):
             return self.elevels
 
+        nself_connected = getattr(self.graph, "nself_connected", 0)
+        if nself_connected > 0:
+            print(
+                "dgraph: %d self-connected transition states were dropped"
+                " from the graph, they are not used for the energy levels"
+                % nself_connected
+            )
+
+        # the statistics cover the whole landscape, they only give the 
+        # range of the edges if no minimum or transition state was removed
+        if (
+            self.statistics is not None
+            and self.energy_attribute == "energy"
+            and self.statistics.ts_energy_min is not None
+            and graph.number_of_nodes() == self.statistics.nminima
+            and graph.number_of_edges()
+            == self.statistics.ntransition_states
+        ):
+            emin = self.statistics.ts_energy_min
+            if self.Emax is None:
+                emax = self.statistics.ts_energy_max
+            else:
+                emax = self.Emax
+            de = (emax - emin) / (self.nlevels - 1)
+            return [emin + de * i for i in range(self.nlevels)]
+
         # define the energy levels
-        elist = [self._getEnergy(self._getTS(*edge)) for edge in graph.edges()]
+        elist = graph.edge_energies()
         if len(elist) == 0:
             raise Exception(
                 "there are no edges in the graph.  Is the global minimum connected?"
             )
-        emin = min(elist)
+        emin = float(elist.min())
         if self.Emax is None:
-            emax = max(elist)
+            emax = float(elist.max())
         else:
             emax = self.Emax
         de = (emax - emin) / (self.nlevels - 1)
@@ -1105,14 +1238,13 @@ class DisconnectivityGraph(object):
         """
         Do the calculations necessary to draw the diconnectivity graph.
         """
-        graph = self.graph
+        graph = self.backend
         assert graph.number_of_nodes() > 0, "graph has no minima"
         assert graph.number_of_edges() > 0, "graph has no transition states"
 
         # we start with applying the energy cutoff, otherwise reduce
         # graph does not work as intended
-        graph = self._remove_high_energy_minima(graph, self.Emax)
-        graph = self._remove_high_energy_transitions(graph, self.Emax)
+        graph = self._remove_high_energy(graph, self.Emax)
         assert (
             graph.number_of_nodes() > 0
         ), "after applying Emax, graph has no minima"
@@ -1128,8 +1260,7 @@ class DisconnectivityGraph(object):
         self.energy_levels = elevels
 
         # remove more nodes
-        graph = self._remove_high_energy_minima(graph, elevels[-1])
-        graph = self._remove_high_energy_transitions(graph, elevels[-1])
+        graph = self._remove_high_energy(graph, elevels[-1])
         graph = self._remove_nodes_with_few_edges(graph, 1)
 
         assert (
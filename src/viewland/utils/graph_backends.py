@@ -0,0 +1,424 @@
+""" Graph backends of the disconnectivity graph: networkx or numpy arrays."""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import networkx as nx
+
+from viewland.storage.records import MinimumRecord, TransitionStateRecord
+
+from .landscape_graph import LandscapeGraph
+from .statistics import connected_components
+
+__all__ = [
+    "GraphBackend",
+    "NetworkxGraph",
+    "ArrayGraph",
+    "make_graph_backend",
+    "BACKENDS",
+    "ARRAY_BACKEND_MIN_NODES",
+]
+
+# The names of the backends accepted by make_graph_backend.
+BACKENDS = ["auto", "networkx", "arrays"]
+
+# With backend "auto", a LandscapeGraph with at least this many minima is
+# handled by ArrayGraph, smaller ones by NetworkxGraph.
+ARRAY_BACKEND_MIN_NODES = 10000
+
+
+class GraphBackend(ABC):
+    """
+    Abstract base class of the graph operations used by
+    DisconnectivityGraph.
+
+    Nodes and edges are addressed by their position, from 0 to
+    number_of_nodes() - 1 and number_of_edges() - 1. The objects of the
+    minima and transition states are only made on request. A graph is
+    never modified, subgraph, remove_nodes and remove_edges return new
+    graphs.
+
+    Parameters
+    ----------
+    energy_attribute : str, optional
+        The attribute of minima and transition states which holds their
+        energy, default is "energy".
+    """
+
+    def __init__(self, energy_attribute="energy"):
+        self.energy_attribute = energy_attribute
+
+    @abstractmethod
+    def number_of_nodes(self):
+        """Return the number of minima."""
+
+    @abstractmethod
+    def number_of_edges(self):
+        """Return the number of transition states."""
+
+    @abstractmethod
+    def nodes(self, indices=None):
+        """Return the minima at indices, default all of them."""
+
+    @abstractmethod
+    def transition_states(self, indices=None):
+        """Return the transition states at indices, default all of them."""
+
+    @abstractmethod
+    def index(self, node):
+        """Return the index of the minimum node, -1 if it is missing."""
+
+    def node_energies(self):
+        """Return the array of the energies of the minima."""
+        return np.array(
+            [getattr(m, self.energy_attribute) for m in self.nodes()],
+            dtype=np.float64,
+        )
+
+    def edge_energies(self):
+        """Return the array of the energies of the transition states."""
+        return np.array(
+            [
+                getattr(ts, self.energy_attribute)
+                for ts in self.transition_states()
+            ],
+            dtype=np.float64,
+        )
+
+    @abstractmethod
+    def edge_nodes(self):
+        """Return the arrays of indices of the two minima of each edge."""
+
+    @abstractmethod
+    def degrees(self):
+        """Return the array of the number of edges of each minimum."""
+
+    def _mask(self, nodes):
+        """Return nodes, indices or a boolean mask, as a boolean mask."""
+        nodes = np.asarray(nodes)
+        if nodes.dtype == bool:
+            return nodes
+        mask = np.zeros(self.number_of_nodes(), dtype=bool)
+        mask[nodes.astype(np.int64)] = True
+        return mask
+
+    @abstractmethod
+    def subgraph(self, nodes, edges=None):
+        """
+        Return the graph of the minima at nodes and the edges between
+        them. nodes are indices or a boolean mask over the minima. If
+        edges, a boolean mask over the edges, is given, only the edges
+        where it is true are kept.
+        """
+
+    def remove_nodes(self, nodes):
+        """Return the graph without the minima at the indices nodes."""
+        return self.subgraph(~self._mask(nodes))
+
+    def remove_edges(self, edges):
+        """Return the graph without the edges at the indices edges."""
+        keep = np.ones(self.number_of_edges(), dtype=bool)
+        keep[np.asarray(edges, dtype=np.int64)] = False
+        return self.subgraph(np.ones(self.number_of_nodes(), bool), keep)
+
+    @abstractmethod
+    def connected_components(self):
+        """Return a list of arrays of the indices of each component."""
+
+    def component_labels(self):
+        """
+        Return the label of the connected component of each minimum, the
+        labels are numbered from 0 in the order of connected_components.
+        """
+        labels = np.zeros(self.number_of_nodes(), dtype=np.int64)
+        for label, nodes in enumerate(self.connected_components()):
+            labels[nodes] = label
+        return labels
+
+    @abstractmethod
+    def node_connected_component(self, node):
+        """Return the indices of the minima connected to the index node."""
+
+
+class NetworkxGraph(GraphBackend):
+    """
+    Graph backend on a networkx graph, the nodes are the minima and the
+    transition states are stored in the edge attribute "ts".
+
+    This is the reference implementation, and the only backend for graphs
+    with Minimum objects of the database.
+
+    Parameters
+    ----------
+    graph : networkx.Graph
+    energy_attribute : str, optional
+    """
+
+    def __init__(self, graph, energy_attribute="energy"):
+        super().__init__(energy_attribute)
+        self.graph = graph
+        self._nodes = list(graph.nodes())
+        self._index = {m: i for i, m in enumerate(self._nodes)}
+        self._edges = list(graph.edges(data="ts"))
+
+    def number_of_nodes(self):
+        return len(self._nodes)
+
+    def number_of_edges(self):
+        return len(self._edges)
+
+    def nodes(self, indices=None):
+        if indices is None:
+            return list(self._nodes)
+        return [self._nodes[i] for i in np.asarray(indices).tolist()]
+
+    def transition_states(self, indices=None):
+        if indices is None:
+            return [ts for _, _, ts in self._edges]
+        return [self._edges[i][2] for i in np.asarray(indices).tolist()]
+
+    def index(self, node):
+        return self._index.get(node, -1)
+
+    def edge_nodes(self):
+        i1 = [self._index[m1] for m1, _, _ in self._edges]
+        i2 = [self._index[m2] for _, m2, _ in self._edges]
+        return np.array(i1, dtype=np.int64), np.array(i2, dtype=np.int64)
+
+    def degrees(self):
+        return np.array(
+            [self.graph.degree(m) for m in self._nodes], dtype=np.int64
+        )
+
+    def subgraph(self, nodes, edges=None):
+        # a read-only view, the graphs of the backends are never modified
+        removed_nodes = self.nodes(np.flatnonzero(~self._mask(nodes)))
+        removed_edges = []
+        if edges is not None:
+            removed_edges = [
+                (m1, m2)
+                for m1, m2, _ in (
+                    self._edges[i] for i in np.flatnonzero(~edges).tolist()
+                )
+            ]
+        graph = nx.restricted_view(self.graph, removed_nodes, removed_edges)
+        return NetworkxGraph(graph, self.energy_attribute)
+
+    def _indices(self, nodes):
+        return np.array([self._index[m] for m in nodes], dtype=np.int64)
+
+    def connected_components(self):
+        return [
+            self._indices(nodes)
+            for nodes in nx.connected_components(self.graph)
+        ]
+
+    def node_connected_component(self, node):
+        return self._indices(
+            nx.node_connected_component(self.graph, self._nodes[node])
+        )
+
+
+class ArrayGraph(GraphBackend):
+    """
+    Graph backend on the numpy arrays of a LandscapeGraph.
+
+    A graph is a selection of the minima and edges of the LandscapeGraph.
+    Connected components are labelled with scipy.sparse.csgraph if scipy
+    is installed, and with vectorized numpy otherwise. MinimumRecord and
+    TransitionStateRecord objects are only made for the minima and
+    transition states which are requested, and are shared by all graphs
+    derived from the same LandscapeGraph.
+
+    Parameters
+    ----------
+    landscape : LandscapeGraph
+    energy_attribute : str, optional
+    """
+
+    def __init__(
+        self,
+        landscape,
+        energy_attribute="energy",
+        _nodes=None,
+        _edges=None,
+        _records=None,
+    ):
+        super().__init__(energy_attribute)
+        self.landscape = landscape
+        if _nodes is None:
+            _nodes = np.arange(landscape.number_of_nodes())
+        if _edges is None:
+            _edges = np.arange(landscape.number_of_edges())
+        # positions in the arrays of the landscape, the nodes are sorted
+        self._node_positions = _nodes
+        self._edge_positions = _edges
+        self._records = ({}, {}) if _records is None else _records
+        self._labels = None
+
+    def _derive(self, nodes, edges):
+        return ArrayGraph(
+            self.landscape, self.energy_attribute, nodes, edges, self._records
+        )
+
+    def number_of_nodes(self):
+        return len(self._node_positions)
+
+    def number_of_edges(self):
+        return len(self._edge_positions)
+
+    def _minimum(self, p):
+        """Return the MinimumRecord of position p of the landscape."""
+        minima = self._records[0]
+        if p not in minima:
+            g = self.landscape
+            minima[p] = MinimumRecord(
+                int(g.ids[p]),
+                float(g.energy[p]),
+                float(g.fvib[p]),
+                int(g.pgorder[p]),
+            )
+        return minima[p]
+
+    def _transition_state(self, p):
+        """Return the TransitionStateRecord of edge p of the landscape."""
+        transition_states = self._records[1]
+        if p not in transition_states:
+            g = self.landscape
+            transition_states[p] = TransitionStateRecord(
+                int(g.ts_id[p]),
+                float(g.ts_energy[p]),
+                self._minimum(int(g.edge_min1[p])),
+                self._minimum(int(g.edge_min2[p])),
+                float(g.ts_fvib[p]),
+                int(g.ts_pgorder[p]),
+            )
+        return transition_states[p]
+
+    def nodes(self, indices=None):
+        positions = self._node_positions
+        if indices is not None:
+            positions = positions[np.asarray(indices, dtype=np.int64)]
+        return [self._minimum(p) for p in positions.tolist()]
+
+    def transition_states(self, indices=None):
+        positions = self._edge_positions
+        if indices is not None:
+            positions = positions[np.asarray(indices, dtype=np.int64)]
+        return [self._transition_state(p) for p in positions.tolist()]
+
+    def index(self, node):
+        p = self.landscape.node_index([node.id()])[0]
+        i = np.searchsorted(self._node_positions, p)
+        if p < 0 or i >= len(self._node_positions):
+            return -1
+        return int(i) if self._node_positions[i] == p else -1
+
+    def edge_nodes(self):
+        g = self.landscape
+        return (
+            np.searchsorted(
+                self._node_positions, g.edge_min1[self._edge_positions]
+            ),
+            np.searchsorted(
+                self._node_positions, g.edge_min2[self._edge_positions]
+            ),
+        )
+
+    def degrees(self):
+        i1, i2 = self.edge_nodes()
+        return np.bincount(
+            np.concatenate([i1, i2]), minlength=self.number_of_nodes()
+        )
+
+    def node_energies(self):
+        if self.energy_attribute in ["energy", "fvib", "pgorder"]:
+            column = getattr(self.landscape, self.energy_attribute)
+            return column[self._node_positions].astype(np.float64)
+        return super().node_energies()
+
+    def edge_energies(self):
+        if self.energy_attribute in ["energy", "fvib", "pgorder"]:
+            column = getattr(self.landscape, "ts_" + self.energy_attribute)
+            return column[self._edge_positions].astype(np.float64)
+        return super().edge_energies()
+
+    def subgraph(self, nodes, edges=None):
+        keep = self._mask(nodes)
+        i1, i2 = self.edge_nodes()
+        keep_edges = keep[i1] & keep[i2]
+        if edges is not None:
+            keep_edges &= edges
+        return self._derive(
+            self._node_positions[keep], self._edge_positions[keep_edges]
+        )
+
+    def component_labels(self):
+        if self._labels is not None:
+            return self._labels
+        n = self.number_of_nodes()
+        i1, i2 = self.edge_nodes()
+        try:
+            from scipy.sparse import coo_matrix
+            from scipy.sparse.csgraph import connected_components as label
+        except ImportError:
+            labels = connected_components(np.arange(n), i1, i2)
+            _, labels = np.unique(labels, return_inverse=True)
+        else:
+            adjacency = coo_matrix(
+                (np.ones(len(i1), dtype=np.int8), (i1, i2)), shape=(n, n)
+            )
+            _, labels = label(adjacency, directed=False)
+        self._labels = labels
+        return labels
+
+    def connected_components(self):
+        labels = self.component_labels()
+        order = np.argsort(labels, kind="stable")
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        return np.split(order, bounds)
+
+    def node_connected_component(self, node):
+        labels = self.component_labels()
+        return np.flatnonzero(labels == labels[node])
+
+
+def make_graph_backend(graph, backend="auto", energy_attribute="energy"):
+    """
+    Return the GraphBackend of a graph.
+
+    Parameters
+    ----------
+    graph : networkx.Graph or LandscapeGraph
+    backend : str, optional
+        "networkx", "arrays" or "auto". With "auto", the default, networkx
+        graphs and LandscapeGraphs with less than ARRAY_BACKEND_MIN_NODES
+        minima use NetworkxGraph and larger LandscapeGraphs ArrayGraph.
+    energy_attribute : str, optional
+
+    Returns
+    -------
+    graph : GraphBackend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            "unknown graph backend {}, use one of {}".format(
+                backend, ", ".join(BACKENDS)
+            )
+        )
+    if isinstance(graph, LandscapeGraph):
+        if backend == "auto":
+            if graph.number_of_nodes() >= ARRAY_BACKEND_MIN_NODES:
+                backend = "arrays"
+            else:
+                backend = "networkx"
+        if backend == "arrays":
+            return ArrayGraph(graph, energy_attribute)
+        return NetworkxGraph(graph.to_networkx(), energy_attribute)
+    if backend == "arrays":
+        raise ValueError(
+            "the arrays backend needs a LandscapeGraph, not a {}".format(
+                type(graph).__name__
+            )
+        )
+    return NetworkxGraph(graph, energy_attribute)
@@ -0,0 +1,321 @@
+""" Compact graph of a landscape in arrays indexed by integer minimum ids."""
+
+import numpy as np
+import networkx as nx
+
+from viewland.storage.records import MinimumRecord, TransitionStateRecord
+
+__all__ = ["LandscapeGraph", "deduplicate_transition_states"]
+
+
+class LandscapeGraph(object):
+    """
+    Graph of the minima and transition states of a landscape, stored in
+    numpy arrays instead of Python objects.
+
+    The nodes are the minima in the order of their ids, the edges are the
+    transition states. Between each pair of minima only the transition
+    state with the lowest energy is kept, and transition states which 
+    connect a minimum to itself are dropped, see 
+    deduplicate_transition_states. The adjacency is stored in
+    compressed sparse row (CSR) format: the neighbours of the node i are
+    indices[indptr[i]:indptr[i + 1]], and the transition states to them
+    are the edges edge_index[indptr[i]:indptr[i + 1]].
+
+    Use LandscapeGraph.from_arrays, from_database or from_snapshot to
+    create a graph.
+
+    Parameters
+    ----------
+    ids, energy, fvib, pgorder : arrays
+        The ids and properties of the minima, sorted by id.
+    edge_min1, edge_min2 : arrays of int
+        The indices of the nodes connected by each edge.
+    ts_id, ts_energy, ts_fvib, ts_pgorder : arrays
+        The ids and properties of the transition state of each edge.
+
+    Attributes
+    ----------
+    indptr, indices, edge_index : arrays of int
+        The CSR adjacency. from_arrays drops self-connected transition
+        states unless keep_self_connected, an edge from a minimum to itself
+        appears once in the row of its minimum.
+    nduplicates : int
+        The number of transition states removed by from_arrays because a
+        lower one connects the same minima.
+    nself_connected : int
+        The number of self-connected transition states removed by
+        from_arrays.
+
+    Examples
+    --------
+    >>> graph = LandscapeGraph.from_database(db, Emax=10.0)
+    >>> dg = DisconnectivityGraph(graph)
+
+    See Also
+    --------
+    DisconnectivityGraph, database2graph
+    """
+
+    nduplicates = 0
+    nself_connected = 0
+
+    def __init__(
+        self,
+        ids,
+        energy,
+        fvib,
+        pgorder,
+        edge_min1,
+        edge_min2,
+        ts_id,
+        ts_energy,
+        ts_fvib,
+        ts_pgorder,
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.energy = np.asarray(energy, dtype=np.float64)
+        self.fvib = np.asarray(fvib, dtype=np.float64)
+        self.pgorder = np.asarray(pgorder)
+        self.edge_min1 = np.asarray(edge_min1, dtype=np.int64)
+        self.edge_min2 = np.asarray(edge_min2, dtype=np.int64)
+        self.ts_id = np.asarray(ts_id, dtype=np.int64)
+        self.ts_energy = np.asarray(ts_energy, dtype=np.float64)
+        self.ts_fvib = np.asarray(ts_fvib, dtype=np.float64)
+        self.ts_pgorder = np.asarray(ts_pgorder)
+        self._build_adjacency()
+
+    @classmethod
+    def from_arrays(
+        cls, minima, transition_states, Emax=None, keep_self_connected=False
+    ):
+        """
+        Make a graph from arrays of minima and transition states.
+
+        Parameters
+        ----------
+        minima : structured array or dict of arrays
+            With the fields id, energy, fvib and pgorder, e.g. from
+            Database.minima_arrays .
+        transition_states : structured array or dict of arrays
+            With the fields id, energy, fvib, pgorder, min1 and min2, e.g.
+            from Database.transition_state_arrays .
+        Emax : float, optional
+            Include only minima and transition states with energy <= Emax.
+            Transition states to minima which are not included are
+            dropped.
+        keep_self_connected : bool, optional
+            Keep the lowest self-connected transition state of each minimum
+            as an edge from the minimum to itself, as database2graph does.
+            By default they are dropped and counted in nself_connected.
+
+        Returns
+        -------
+        graph : LandscapeGraph
+        """
+        ids = np.asarray(minima["id"], dtype=np.int64)
+        energy = np.asarray(minima["energy"], dtype=np.float64)
+        keep = np.ones(len(ids), dtype=bool)
+        if Emax is not None:
+            keep &= energy <= Emax
+        order = np.argsort(ids[keep], kind="stable")
+        nodes = {
+            name: np.asarray(minima[name])[keep][order]
+            for name in ["id", "energy", "fvib", "pgorder"]
+        }
+
+        ts_energy = np.asarray(transition_states["energy"], dtype=np.float64)
+        min1 = np.asarray(transition_states["min1"], dtype=np.int64)
+        min2 = np.asarray(transition_states["min2"], dtype=np.int64)
+        i1 = _index(nodes["id"], min1)
+        i2 = _index(nodes["id"], min2)
+        keep = (i1 >= 0) & (i2 >= 0)
+        if Emax is not None:
+            keep &= ts_energy <= Emax
+        selected = np.flatnonzero(keep)
+        unique, nduplicates, nself_connected = deduplicate_transition_states(
+            i1[selected],
+            i2[selected],
+            ts_energy[selected],
+            keep_self_connected=keep_self_connected,
+        )
+        selected = selected[unique]
+
+        graph = cls(
+            nodes["id"],
+            nodes["energy"],
+            nodes["fvib"],
+            nodes["pgorder"],
+            i1[selected],
+            i2[selected],
+            np.asarray(transition_states["id"])[selected],
+            ts_energy[selected],
+            np.asarray(transition_states["fvib"])[selected],
+            np.asarray(transition_states["pgorder"])[selected],
+        )
+        graph.nduplicates = nduplicates
+        graph.nself_connected = nself_connected
+        return graph
+
+    @classmethod
+    def from_database(cls, db, Emax=None):
+        """
+        Make a graph from the landscape of a Database, Emax is applied by
+        the database, see from_arrays.
+        """
+        return cls.from_arrays(
+            db.minima_arrays(emax=Emax),
+            db.transition_state_arrays(emax=Emax),
+            Emax=Emax,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot, Emax=None):
+        """Make a graph from a LandscapeSnapshot, see from_arrays."""
+        return cls.from_arrays(
+            snapshot.minima, snapshot.transition_states, Emax=Emax
+        )
+
+    def _build_adjacency(self):
+        """Compute the CSR arrays indptr, indices and edge_index."""
+        nedges = len(self.edge_min1)
+        loop = self.edge_min1 == self.edge_min2
+        rows = np.concatenate([self.edge_min1, self.edge_min2[~loop]])
+        columns = np.concatenate([self.edge_min2, self.edge_min1[~loop]])
+        edges = np.concatenate([np.arange(nedges), np.flatnonzero(~loop)])
+        order = np.argsort(rows, kind="stable")
+        counts = np.bincount(rows, minlength=len(self.ids))
+        self.indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.indices = columns[order]
+        self.edge_index = edges[order]
+
+    def number_of_nodes(self):
+        """Return the number of minima."""
+        return len(self.ids)
+
+    def number_of_edges(self):
+        """Return the number of transition states."""
+        return len(self.edge_min1)
+
+    def node_index(self, ids):
+        """
+        Return the node indices of the minima with the given ids, -1 for
+        ids which are not in the graph.
+        """
+        return _index(self.ids, ids)
+
+    def neighbors(self, i):
+        """Return the node indices of the neighbours of the node i."""
+        return self.indices[self.indptr[i] : self.indptr[i + 1]]
+
+    def degree(self):
+        """Return the number of neighbours of each node."""
+        return np.diff(self.indptr)
+
+    def to_networkx(self):
+        """
+        Return the networkx graph made by database2graph(records=True), 
+        with MinimumRecord nodes and TransitionStateRecord objects in the edge
+        attribute "ts".
+        """
+        minima = [
+            MinimumRecord(id, energy, fvib, pgorder)
+            for id, energy, fvib, pgorder in zip(
+                self.ids.tolist(),
+                self.energy.tolist(),
+                self.fvib.tolist(),
+                self.pgorder.tolist(),
+            )
+        ]
+        graph = nx.Graph()
+        graph.add_nodes_from(minima)
+        graph.add_edges_from(
+            (
+                minima[i1],
+                minima[i2],
+                dict(
+                    ts=TransitionStateRecord(
+                        id, energy, minima[i1], minima[i2], fvib, pgorder
+                    )
+                ),
+            )
+            for i1, i2, id, energy, fvib, pgorder in zip(
+                self.edge_min1.tolist(),
+                self.edge_min2.tolist(),
+                self.ts_id.tolist(),
+                self.ts_energy.tolist(),
+                self.ts_fvib.tolist(),
+                self.ts_pgorder.tolist(),
+            )
+        )
+        return graph
+
+    def __repr__(self):
+        return "<LandscapeGraph(minima='{}', transition_states='{}')>".format(
+            self.number_of_nodes(), self.number_of_edges()
+        )
+
+
+def deduplicate_transition_states(
+    min1, min2, energy, keep_self_connected=False
+):
+    """
+    Select the transition state with the lowest energy between each pair
+    of minima and drop those which connect a minimum to itself, unless
+    keep_self_connected.
+
+    The pairs are made canonical as (min(min1, min2), max(min1, min2)) and
+    sorted with np.lexsort, the first of each run of equal pairs is kept.
+    Of transition states with equal energy the last one is kept, as when 
+    adding them to a networkx graph in the order of decreasing energy.
+
+    Parameters
+    ----------
+    min1, min2 : arrays of int
+        The ids of the minima connected by each transition state.
+    energy : array of float
+        The energies of the transition states.
+    keep_self_connected : bool, optional
+        If True, the lowest self-connected transition state of each
+        minimum is kept like those of other pairs.
+
+    Returns
+    -------
+    keep : array of int
+        Indices of the kept transition states, sorted by pair of minima.
+    nduplicates : int
+        The number of transition states dropped because a lower one
+        connects the same minima.
+    nself_connected : int
+        The number of dropped self-connected transition states.
+    """
+    min1 = np.asarray(min1)
+    min2 = np.asarray(min2)
+    energy = np.asarray(energy)
+    lower = np.minimum(min1, min2)
+    upper = np.maximum(min1, min2)
+    if keep_self_connected:
+        candidates = np.arange(len(min1))
+    else:
+        candidates = np.flatnonzero(lower != upper)
+    lower, upper = lower[candidates], upper[candidates]
+    order = np.lexsort((-candidates, energy[candidates], upper, lower))
+    lower, upper = lower[order], upper[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (lower[1:] != lower[:-1]) | (upper[1:] != upper[:-1])
+    keep = candidates[order[first]]
+    return (
+        keep,
+        len(candidates) - len(keep),
+        len(min1) - len(candidates),
+    )
+
+
+def _index(sorted_ids, ids):
+    """Return the positions of ids in sorted_ids, -1 if missing."""
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(sorted_ids) == 0:
+        return np.full(ids.shape, -1, dtype=np.int64)
+    i = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[i] == ids, i, -1)
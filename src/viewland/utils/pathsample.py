@@ -0,0 +1,397 @@
+""" Columnar parsers for the PATHSAMPLE files min.data and ts.data."""
+
+import bz2
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import io
+from itertools import islice
+import lzma
+import os
+import warnings
+
+import numpy as np
+
+__all__ = [
+    "MIN_DTYPE",
+    "TS_DTYPE",
+    "read_min_data",
+    "read_ts_data",
+    "iter_min_data",
+    "iter_ts_data",
+    "split_byte_ranges",
+    "iter_byte_ranges",
+    "open_source",
+    "is_compressed",
+    "ParseError",
+]
+
+# Magic bytes at the start of compressed files.
+GZIP_MAGIC = b"\x1f\x8b"
+BZ2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Upper bound for the size of the byte ranges parsed by one worker process.
+CHUNK_BYTES = 1 << 24
+
+# Record layout of a line in min.data: energy, fvib, point group order.
+# The remaining columns (moments of inertia) are not used.
+MIN_DTYPE = np.dtype(
+    [("energy", np.float64), ("fvib", np.float64), ("pgorder", np.int32)]
+)
+
+# Record layout of a line in ts.data: energy, fvib, point group order and
+# the ids of the two minima connected by the transition state.
+TS_DTYPE = np.dtype(
+    [
+        ("energy", np.float64),
+        ("fvib", np.float64),
+        ("pgorder", np.int32),
+        ("min1", np.int64),
+        ("min2", np.int64),
+    ]
+)
+
+
+def _compression(path):
+    """Return the compression format of a file, or None."""
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    for name, prefix in [
+        ("gzip", GZIP_MAGIC),
+        ("bz2", BZ2_MAGIC),
+        ("xz", XZ_MAGIC),
+        ("zstd", ZSTD_MAGIC),
+    ]:
+        if magic.startswith(prefix):
+            return name
+    return None
+
+
+def is_compressed(path):
+    """Return True if the file is gzip, bz2, xz or zstd compressed."""
+    return _compression(path) is not None
+
+
+def open_source(path):
+    """
+    Open a file for reading its decompressed content as bytes.
+
+    gzip, bz2 and xz compressed files are recognised by their magic bytes
+    and decompressed as a stream, without temporary files.  zstd is
+    supported if the zstandard module is installed.  Other files are
+    opened as they are.
+    """
+    compression = _compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    elif compression == "bz2":
+        return bz2.open(path, "rb")
+    elif compression == "xz":
+        return lzma.open(path, "rb")
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "install the zstandard package to read {}".format(path)
+            )
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True
+        )
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+def _open_text(path):
+    """Open a possibly compressed file for reading text lines."""
+    return io.TextIOWrapper(open_source(path))
+
+
+class ParseError(ValueError):
+    """
+    A line of min.data or ts.data which is not a record, e.g. an empty
+    line. Such lines are rejected, since the id of a minimum is its line
+    number.
+
+    Attributes
+    ----------
+    message : str
+        What is wrong with the line, "empty" or "comment".
+    line : int
+        The number of the line, counted from 1 at the first parsed line.
+    """
+
+    def __init__(self, message, line):
+        super().__init__(message, line)
+        self.message = message
+        self.line = line
+
+    def __str__(self):
+        return "{} line {}".format(self.message, self.line)
+
+
+def _check_lines(lines):
+    """Raise ParseError for the first empty or comment line in lines."""
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if len(stripped) == 0:
+            raise ParseError("empty", i + 1)
+        if stripped.startswith("#"):
+            raise ParseError("comment", i + 1)
+
+
+def _load_columns(lines, dtype):
+    """
+    Parse whitespace separated columns into a structured array.
+
+    Parameters
+    ----------
+    lines : list of str
+        The lines to parse.
+    dtype : numpy dtype
+        Structured dtype, one field per leading column of the file.
+
+    Returns
+    -------
+    data : numpy structured array
+        One record per line, in file order.
+
+    Raises
+    ------
+    ParseError
+        If a line is empty or a comment, which numpy.loadtxt would skip.
+    """
+    with warnings.catch_warnings():
+        # An empty file is a valid (empty) landscape.
+        warnings.filterwarnings("ignore", message=".*[Ee]mpty input.*")
+        warnings.filterwarnings("ignore", message=".*no data.*")
+        try:
+            data = np.loadtxt(
+                lines,
+                dtype=dtype,
+                comments=None,
+                usecols=range(len(dtype.names)),
+                ndmin=1,
+            )
+        except ValueError:
+            _check_lines(lines)
+            raise
+    if len(data) != len(lines):
+        _check_lines(lines)
+    return data
+
+
+def _read_columns(source, dtype, nprocs):
+    """
+    Parse a whole file, in parallel if nprocs > 1 and source is the path of
+    an uncompressed file.
+    """
+    if isinstance(source, str):
+        if nprocs is None or nprocs <= 1 or is_compressed(source):
+            with _open_text(source) as f:
+                return _read_columns(f, dtype, None)
+        blocks = [
+            records
+            for _, _, records in iter_byte_ranges(source, dtype, nprocs)
+        ]
+        if len(blocks) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.concatenate(blocks)
+    blocks = list(_iter_batches(source, dtype, 100000))
+    if len(blocks) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(blocks)
+
+
+def read_min_data(source, nprocs=None):
+    """
+    Read min.data into a structured array with the fields of MIN_DTYPE.
+
+    The id of a minimum is its line number (starting from 1), i.e. record
+    ``i`` of the returned array is the minimum with id ``i + 1``. If nprocs
+    is larger than 1, the file is parsed by that many processes.
+    Compressed files are decompressed on the fly, see open_source. An empty
+    or comment line raises a ParseError, as it would shift the ids.
+    """
+    return _read_columns(source, MIN_DTYPE, nprocs)
+
+
+def read_ts_data(source, nprocs=None):
+    """
+    Read ts.data into a structured array with the fields of TS_DTYPE.
+
+    The fields min1 and min2 hold the ids of the connected minima, which
+    are line numbers in min.data. If nprocs is larger than 1, the file is
+    parsed by that many processes. Compressed files are decompressed on the
+    fly, see open_source. An empty or comment line raises a ParseError.
+    """
+    return _read_columns(source, TS_DTYPE, nprocs)
+
+
+def _iter_batches(source, dtype, batch_size):
+    """
+    Yield consecutive blocks of at most batch_size parsed lines.
+
+    Only one block of lines is held in memory at a time. The line numbers
+    of a ParseError are counted from the first line of source.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    if isinstance(source, str):
+        with _open_text(source) as f:
+            yield from _iter_batches(f, dtype, batch_size)
+        return
+    lines = iter(source)
+    nlines = 0
+    while True:
+        block = list(islice(lines, batch_size))
+        if len(block) == 0:
+            return
+        try:
+            records = _load_columns(block, dtype)
+        except ParseError as error:
+            raise ParseError(error.message, nlines + error.line) from None
+        nlines += len(block)
+        yield records
+
+
+def iter_min_data(source, batch_size=100000):
+    """
+    Iterate over min.data in blocks of at most batch_size minima.
+
+    Each block is a structured array with the fields of MIN_DTYPE.
+    """
+    return _iter_batches(source, MIN_DTYPE, batch_size)
+
+
+def iter_ts_data(source, batch_size=100000):
+    """
+    Iterate over ts.data in blocks of at most batch_size transition states.
+
+    Each block is a structured array with the fields of TS_DTYPE.
+    """
+    return _iter_batches(source, TS_DTYPE, batch_size)
+
+
+def split_byte_ranges(path, chunk_bytes=CHUNK_BYTES, start=0, stop=None):
+    """
+    Split a file into byte ranges of roughly chunk_bytes which begin and
+    end on line boundaries.
+
+    Parameters
+    ----------
+    path : str
+    chunk_bytes : int, optional
+        The approximate size of a range.
+    start : int, optional
+        The byte offset of the first range, must be at the start of a line.
+    stop : int, optional
+        The byte offset where the last range ends, must be at the start of
+        a line. Default is the size of the file.
+
+    Returns
+    -------
+    ranges : list of (begin, end) tuples
+        Consecutive half-open byte ranges which cover the file from start
+        to stop.
+    """
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be a positive integer")
+    size = os.path.getsize(path) if stop is None else stop
+    ranges = []
+    begin = start
+    with open(path, "rb") as f:
+        while begin < size:
+            end = begin + chunk_bytes
+            if end < size:
+                # extend the range to the end of the line containing end - 1
+                f.seek(end - 1)
+                f.readline()
+                end = f.tell()
+            else:
+                end = size
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+def _parse_byte_range(path, begin, end, dtype):
+    """Parse the lines in the byte range [begin, end) of a file."""
+    with open(path, "rb") as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    return _load_columns(data.decode().splitlines(), dtype)
+
+
+def iter_byte_ranges(
+    path, dtype, nprocs, start=0, chunk_bytes=None, stop=None
+):
+    """
+    Parse a file in a pool of processes, one byte range per task.
+
+    Parameters
+    ----------
+    path : str
+    dtype : numpy dtype
+        MIN_DTYPE for min.data or TS_DTYPE for ts.data.
+    nprocs : int
+        The number of worker processes.
+    start : int, optional
+        The byte offset to start from, must be at the start of a line.
+    chunk_bytes : int, optional
+        The size of the byte ranges. By default the file is split evenly
+        between the workers, in ranges of at most CHUNK_BYTES.
+    stop : int, optional
+        The byte offset to stop at, must be at the start of a line. Default
+        is the end of the file.
+
+    Yields
+    ------
+    begin, end, records :
+        The byte range and its parsed lines, in file order. At most
+        2 * nprocs ranges are parsed ahead of the consumer.
+
+    Raises
+    ------
+    ParseError
+        With the line number counted from the line at start.
+    """
+    if is_compressed(path):
+        raise ValueError(
+            "{} is compressed and cannot be split into byte ranges".format(
+                path
+            )
+        )
+    if stop is None:
+        stop = os.path.getsize(path)
+    if chunk_bytes is None:
+        size = stop - start
+        chunk_bytes = min(CHUNK_BYTES, max(1, -(-size // nprocs)))
+    ranges = split_byte_ranges(path, chunk_bytes, start, stop)
+    # the number of lines in the ranges yielded so far
+    nlines = 0
+
+    def result(future):
+        nonlocal nlines
+        try:
+            records = future.result()
+        except ParseError as error:
+            raise ParseError(error.message, nlines + error.line) from None
+        nlines += len(records)
+        return records
+
+    with ProcessPoolExecutor(max_workers=nprocs) as executor:
+        pending = deque()
+        for begin, end in ranges:
+            future = executor.submit(
+                _parse_byte_range, path, begin, end, dtype
+            )
+            pending.append((begin, end, future))
+            if len(pending) >= 2 * nprocs:
+                begin, end, future = pending.popleft()
+                yield begin, end, result(future)
+        while len(pending) > 0:
+            begin, end, future = pending.popleft()
+            yield begin, end, result(future)
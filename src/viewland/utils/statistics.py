@@ -0,0 +1,280 @@
+""" Global statistics of a landscape, computed from arrays of its data."""
+
+import numpy as np
+
+__all__ = [
+    "landscape_statistics",
+    "stream_landscape_statistics",
+    "connected_components",
+    "merge_components",
+    "QUANTILE_LEVELS",
+]
+
+# Probabilities at which the quantiles of the energies are stored.
+QUANTILE_LEVELS = np.linspace(0.0, 1.0, 11)
+
+# Number of bins of the histogram of transition state energies.
+HISTOGRAM_BINS = 50
+
+
+def connected_components(ids, min1, min2):
+    """
+    Label the connected components of the graph of minima and transition
+    states.
+
+    The labels are found by repeatedly hooking the root of the larger label
+    of each edge onto the smaller one, followed by pointer jumping, all as
+    vectorized numpy operations.
+
+    Parameters
+    ----------
+    ids : array of int
+        The ids of the minima, i.e. the nodes.
+    min1, min2 : arrays of int
+        The ids of the minima connected by each transition state. Edges to
+        minima which are not in ids are ignored.
+
+    Returns
+    -------
+    labels : array of int
+        For each minimum in ids the smallest index into ids within its
+        component.
+    """
+    ids = np.asarray(ids)
+    if len(ids) == 0:
+        return np.zeros(0, dtype=int)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    def index(m):
+        # position of the minima m in ids, or -1 if they are not in ids
+        m = np.asarray(m)
+        i = np.minimum(np.searchsorted(sorted_ids, m), len(ids) - 1)
+        found = sorted_ids[i] == m
+        return np.where(found, order[i], -1)
+
+    i1, i2 = index(min1), index(min2)
+    keep = (i1 >= 0) & (i2 >= 0)
+    return merge_components(np.arange(len(ids)), i1[keep], i2[keep])
+
+
+def merge_components(labels, i1, i2):
+    """
+    Merge the components of labels which are connected by the edges
+    between the nodes i1 and i2, see connected_components.
+
+    Parameters
+    ----------
+    labels : array of int
+        For each node the smallest node of its component, e.g. 
+        numpy.arange(n) for n isolated nodes.
+    i1, i2 : arrays of int
+        The indices of the nodes connected by each edge.
+
+    Returns
+    -------
+    labels : array of int
+        The labels of the merged components, labels may be modified.
+    """
+    keep = i1 != i2
+    i1, i2 = i1[keep], i2[keep]
+    while True:
+        l1, l2 = labels[i1], labels[i2]
+        merge = l1 != l2
+        if not merge.any():
+            return labels
+        lower = np.minimum(l1[merge], l2[merge])
+        upper = np.maximum(l1[merge], l2[merge])
+        np.minimum.at(labels, upper, lower)
+        # pointer jumping until every label is a root
+        while True:
+            parents = labels[labels]
+            if (parents == labels).all():
+                break
+            labels = parents
+
+
+class _SortedQuantiles(object):
+    """
+    Collects the quantiles at QUANTILE_LEVELS of n values which are seen
+    in ascending order, block by block. They are interpolated linearly as
+    by numpy.quantile .
+    """
+
+    def __init__(self, n):
+        self.position = QUANTILE_LEVELS * (n - 1)
+        self.below = np.floor(self.position).astype(int)
+        self.above = np.minimum(self.below + 1, n - 1)
+        self.values = np.zeros(2 * len(QUANTILE_LEVELS))
+        self.indices = np.concatenate([self.below, self.above])
+        self.start = 0
+
+    def update(self, values):
+        """Add the next block of the sorted values."""
+        stop = self.start + len(values)
+        found = (self.indices >= self.start) & (self.indices < stop)
+        self.values[found] = values[self.indices[found] - self.start]
+        self.start = stop
+
+    def quantiles(self):
+        a, b = np.split(self.values, 2)
+        t = self.position - self.below
+        # the same linear interpolation as numpy
+        return np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+
+
+def landscape_statistics(minima, transition_states, nbins=HISTOGRAM_BINS):
+    """
+    Compute global statistics of a landscape.
+
+    Parameters
+    ----------
+    minima : structured array or dict of arrays
+        With the fields id and energy, e.g. from Database.minima_arrays .
+    transition_states : structured array or dict of arrays
+        With the fields energy, min1 and min2, e.g. from
+        Database.transition_state_arrays .
+    nbins : int, optional
+        The number of bins of the histogram of transition state energies.
+
+    Returns
+    -------
+    statistics : dict
+        With the keys nminima, ntransition_states, global_minimum_id,
+        minimum_energy_min, minimum_energy_max, minimum_energy_quantiles,
+        ts_energy_min, ts_energy_max, ts_energy_quantiles,
+        ts_energy_histogram, ts_energy_bin_edges, nself_connected and
+        ncomponents. The quantiles are at QUANTILE_LEVELS, values which do
+        not exist for an empty landscape are None.
+    """
+    ids = np.asarray(minima["id"])
+    energy = np.asarray(minima["energy"], dtype=float)
+    ts_energy = np.asarray(transition_states["energy"], dtype=float)
+    order = np.argsort(energy, kind="stable")
+    ts_order = np.argsort(ts_energy, kind="stable")
+    return stream_landscape_statistics(
+        [dict(id=ids[order], energy=energy[order])],
+        [
+            dict(
+                energy=ts_energy[ts_order],
+                min1=np.asarray(transition_states["min1"])[ts_order],
+                min2=np.asarray(transition_states["min2"])[ts_order],
+            )
+        ],
+        len(ts_energy),
+        ts_energy_range=(ts_energy.min(), ts_energy.max())
+        if len(ts_energy) > 0
+        else None,
+        nbins=nbins,
+    )
+
+
+def stream_landscape_statistics(
+    minima,
+    transition_states,
+    ntransition_states,
+    ts_energy_range=None,
+    nbins=HISTOGRAM_BINS,
+):
+    """
+    Compute global statistics of a landscape from blocks of its minima and
+    transition states, e.g. from Database.iter_minima_arrays and 
+    Database.iter_transition_state_arrays .
+
+    Only one block of transition states is held in memory at a time, 
+    together with the ids, energies and component labels of all minima.
+
+    Parameters
+    ----------
+    minima : iterable of structured arrays or dicts of arrays
+        With the fields id and energy, in ascending order of energy.
+    transition_states : iterable of structured arrays or dicts of arrays
+        With the fields energy, min1 and min2, in ascending order of 
+        energy.
+    ntransition_states : int
+        The number of transition states.
+    ts_energy_range : (float, float), optional
+        The lowest and highest transition state energy, which are needed
+        for the bins of the histogram before the blocks are read. Required
+        if there are transition states.
+    nbins : int, optional
+        The number of bins of the histogram of transition state energies.
+
+    Returns
+    -------
+    statistics : dict
+        See landscape_statistics.
+    """
+    ids = []
+    energies = []
+    for block in minima:
+        ids.append(np.asarray(block["id"]))
+        energies.append(np.asarray(block["energy"], dtype=float))
+    ids = np.concatenate(ids) if len(ids) > 0 else np.zeros(0, dtype=int)
+    energy = np.concatenate(energies) if len(energies) > 0 else np.zeros(0)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    labels = np.arange(len(ids))
+
+    statistics = dict(
+        nminima=len(ids),
+        ntransition_states=ntransition_states,
+        global_minimum_id=None,
+        minimum_energy_min=None,
+        minimum_energy_max=None,
+        minimum_energy_quantiles=None,
+        ts_energy_min=None,
+        ts_energy_max=None,
+        ts_energy_quantiles=None,
+        ts_energy_histogram=None,
+        ts_energy_bin_edges=None,
+        nself_connected=0,
+        ncomponents=0,
+    )
+    if len(ids) > 0:
+        # of equal energies the lowest id, as numpy.argmin in id order
+        lowest = ids[energy == energy[0]].min()
+        statistics.update(
+            global_minimum_id=int(lowest),
+            minimum_energy_min=float(energy[0]),
+            minimum_energy_max=float(energy[-1]),
+            minimum_energy_quantiles=np.quantile(energy, QUANTILE_LEVELS),
+        )
+
+    def index(m):
+        # position of the minima m in ids, or -1 if they are not in ids
+        m = np.asarray(m)
+        i = np.minimum(np.searchsorted(sorted_ids, m), len(ids) - 1)
+        found = sorted_ids[i] == m
+        return np.where(found, order[i], -1)
+
+    quantiles = _SortedQuantiles(ntransition_states)
+    histogram = edges = None
+    if ntransition_states > 0:
+        edges = np.histogram_bin_edges([], bins=nbins, range=ts_energy_range)
+        histogram = np.zeros(nbins, dtype=np.int64)
+    for block in transition_states:
+        energy = np.asarray(block["energy"], dtype=float)
+        if len(energy) == 0:
+            continue
+        min1, min2 = np.asarray(block["min1"]), np.asarray(block["min2"])
+        statistics["nself_connected"] += int(np.count_nonzero(min1 == min2))
+        counts, _ = np.histogram(energy, bins=nbins, range=ts_energy_range)
+        histogram += counts
+        quantiles.update(energy)
+        if len(ids) > 0:
+            i1, i2 = index(min1), index(min2)
+            keep = (i1 >= 0) & (i2 >= 0)
+            labels = merge_components(labels, i1[keep], i2[keep])
+
+    if len(ids) > 0:
+        statistics["ncomponents"] = len(np.unique(labels))
+    if ntransition_states > 0:
+        statistics.update(
+            ts_energy_min=float(ts_energy_range[0]),
+            ts_energy_max=float(ts_energy_range[1]),
+            ts_energy_quantiles=quantiles.quantiles(),
+            ts_energy_histogram=histogram,
+            ts_energy_bin_edges=edges,
+        )
+    return statistics
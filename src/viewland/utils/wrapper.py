@@ -1,4 +1,4 @@
-from viewland.utils import DisconnectivityGraph, database2graph, Converter
+from viewland.utils import DisconnectivityGraph, LandscapeGraph, Converter
 from viewland.storage import Database
 from viewland.storage.database import create_connect_string
 
@@ -12,13 +12,25 @@ import numpy as np
 __all__ = ["create_graph"]
 
 def create_graph(mindata : str, tsdata : str, conf : str,
-        colour : str, output : str):
+        colour : str, output : str, incremental : bool = False,
+        landscape : str = "default"):
     '''
     This wrapper function read in data and create the disconnectivity graph.
 
     Parameters
     ----------
-
+    incremental : bool, optional
+        Keep the data of the previous call and only import the lines which 
+        have been appended to min.data and ts.data since then.
+    landscape : str, optional
+        Name of the landscape in the database the data is stored in. 
+        Other landscapes in the same database are left untouched.
+
+    Notes
+    -----
+    If min.data and ts.data are identical to the files imported by the 
+    previous call, the data in the database is reused without reading the 
+    files again.
     '''
     # Check the existence of files
     dic = {'min.data' : mindata,
@@ -50,10 +62,17 @@ def create_graph(mindata : str, tsdata : str, conf : str,
     # Matplotlib colormap name.
     cmap = config["settings"]["CMAP"]
 
-    # Read in data to the database
-    db = Database(create_connect_string())
+    # Read in data to the database, unless the database already holds
+    # exactly these files.
+    db = Database(create_connect_string(), reset=False, landscape=landscape)
     converter = Converter(db, mindata, tsdata)
-    converter.convert_no_coords()
+    if converter.is_up_to_date():
+        print("min.data and ts.data are unchanged, reusing the database")
+    else:
+        converter.convert_no_coords(incremental=incremental)
+    statistics = db.get_statistics()
+    if statistics is None:
+        statistics = converter.compute_statistics()
 
     # Define the colorbar range.
     # color_range will be scaled to [0,1] by cm.ScalarMappable.
@@ -69,8 +88,12 @@ def create_graph(mindata : str, tsdata : str, conf : str,
     elevels = list(np.arange(emin, emax + step, step, dtype=float))
 
     # Create the disconnectivity graph.
-    graph = database2graph(db)
-    dg = DisconnectivityGraph(graph)
+    graph = LandscapeGraph.from_database(db)
+    print(
+        "--->removed %s duplicate and %s self-connected transition states"
+        % (graph.nduplicates, graph.nself_connected)
+    )
+    dg = DisconnectivityGraph(graph, statistics=statistics)
     dg.set_energy_levels(elevels)
     dg.calculate()
 
@@ -0,0 +1,51 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from viewland.storage import Database, Minimum
+from viewland.storage.database import create_sqlite_connect_string
+from viewland.utils import Converter
+
+pytest.importorskip("aiosqlite")
+
+
+def test_async_database(tmp_path):
+    """
+    Test if AsyncDatabase returns the same data as Database.
+    """
+    from viewland.storage.asyncdb import AsyncDatabase
+    from viewland.storage.engine import dispose_async_engines
+
+    string = create_sqlite_connect_string(str(tmp_path / "test.db"))
+    db = Database(string)
+    Converter(
+        db, mindata="tests/testdata/min.data", tsdata="tests/testdata/ts.data"
+    ).convert_no_coords()
+
+    async def run():
+        adb = await AsyncDatabase.open(string)
+        assert await adb.number_of_minima() == db.number_of_minima()
+        lowest = await adb.get_lowest_energy_minimum()
+        assert lowest.id() == db.get_lowest_energy_minimum().id()
+        arrays = await adb.transition_state_arrays(order_energy=True)
+        assert (arrays == db.transition_state_arrays(order_energy=True)).all()
+        ids = [ts.id() async for ts in adb.iter_transition_states()]
+        assert ids == [ts.id() for ts in db.transition_states()]
+
+        other = await AsyncDatabase.open(string, landscape="other")
+        nrows = await other.bulk_insert(
+            Minimum.__table__,
+            dict(
+                landscape_id=np.full(3, other.landscape_id),
+                _id=np.arange(1, 4),
+                energy=np.ones(3),
+            ),
+        )
+        assert nrows == 3 and await other.number_of_minima() == 3
+        await adb.close()
+        await other.close()
+        await dispose_async_engines()
+
+    asyncio.run(run())
+    db.close()
@@ -0,0 +1,60 @@
+from viewland.storage.bulk import (
+    _IteratorFile,
+    _copy_chunks,
+    bulk_insert,
+    COPY_CHUNK_SIZE,
+)
+
+import numpy as np
+import pytest
+
+
+def test_iterator_file():
+    """Test if reads of any size return the chunks in order."""
+    chunks = ["abc", "", "defgh", "i"]
+    stream = _IteratorFile(chunks)
+    assert stream.read(2) == "ab"
+    assert stream.read(4) == "cdef"
+    assert stream.read(0) == ""
+    assert stream.read() == "ghi"
+    assert stream.read(8) == ""
+
+    stream = _IteratorFile(chunks)
+    data = []
+    while True:
+        part = stream.read(3)
+        if part == "":
+            break
+        data.append(part)
+    assert "".join(data) == "".join(chunks)
+
+
+def test_copy_chunks():
+    """Test the COPY text format of the rows and the size of the chunks."""
+    nrows = COPY_CHUNK_SIZE + 2
+    ids = np.arange(nrows)
+    energies = np.linspace(0.0, 1.0, nrows)
+    chunks = list(_copy_chunks([ids, energies], nrows))
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == nrows
+    assert lines[0] == "0\t0.0"
+    assert lines[-1] == "{}\t1.0".format(nrows - 1)
+
+
+def test_bulk_insert_method():
+    """Test if COPY and unknown methods are rejected on SQLite."""
+    from sqlalchemy import create_engine, Column, Integer, MetaData, Table
+
+    engine = create_engine("sqlite://")
+    table = Table("numbers", MetaData(), Column("value", Integer))
+    table.create(engine)
+    columns = dict(value=np.arange(3))
+    with pytest.raises(ValueError):
+        bulk_insert(engine, table, columns, method="copy")
+    with pytest.raises(ValueError):
+        bulk_insert(engine, table, columns, method="csv")
+    assert bulk_insert(engine, table, columns) == 3
+    with engine.connect() as connection:
+        rows = connection.execute(table.select()).fetchall()
+    assert [row[0] for row in rows] == [0, 1, 2]
@@ -0,0 +1,114 @@
+from viewland.utils import Converter
+from viewland.storage import Database, MemoryCache, DiskCache
+from viewland.storage.database import create_connect_string
+
+import pytest
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_cache_lru(backend, tmp_path):
+    """
+    Test the eviction of the least recently used entry and the counters.
+    """
+    if backend == "memory":
+        cache = MemoryCache(maxsize=2)
+    else:
+        cache = DiskCache(str(tmp_path / "cache.db"), maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", [2])
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert len(cache) == 2
+    with pytest.raises(KeyError):
+        cache.get("b")
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0
+
+
+def test_query_cache_abstract():
+    """Test if an incomplete cache class cannot be instantiated."""
+    from viewland.storage.cache import QueryCache
+
+    class Incomplete(QueryCache):
+        def put(self, key, value):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete(10)
+
+
+def test_disk_cache_persists(tmp_path):
+    """Test if entries of a DiskCache are kept after it is closed."""
+    path = str(tmp_path / "cache.db")
+    cache = DiskCache(path)
+    cache.put(("minima", 1), {"energy": [1.0, 2.0]})
+    cache.close()
+    assert DiskCache(path).get(("minima", 1)) == {"energy": [1.0, 2.0]}
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_database_cache(backend, tmp_path):
+    """
+    Test if repeated queries are answered from the cache and if writes
+    invalidate the cached results.
+    """
+    if backend == "memory":
+        cache = MemoryCache()
+    else:
+        cache = DiskCache(str(tmp_path / "cache.db"))
+    db = Database(create_connect_string(), cache=cache)
+    Converter(
+        db, mindata="tests/testdata/min.data", tsdata="tests/testdata/ts.data"
+    ).convert_no_coords()
+    cache.clear()
+
+    lowest = db.get_lowest_energy_minimum()
+    transition_states = db.transition_states(order_energy=True)
+    assert db.number_of_minima() == 10
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert db.get_lowest_energy_minimum() == lowest
+    assert db.transition_states(order_energy=True) == transition_states
+    assert db.number_of_minima() == 10
+    assert (cache.hits, cache.misses) == (3, 3)
+    # cached objects are usable in the session
+    assert db.get_lowest_energy_minimum() in db.session
+    assert db.transition_states(order_energy=True)[0].minimum1 is not None
+
+    db.reset()
+    assert db.number_of_minima() == 0
+    assert db.transition_states(order_energy=True) == []
+    db.close()
+
+
+def test_cache_shared_by_databases(tmp_path):
+    """
+    Test if databases which share a cache, also a recreated one, do not 
+    get the results of each other.
+    """
+    from viewland.storage.database import create_sqlite_connect_string
+
+    cache = DiskCache(str(tmp_path / "cache.db"))
+    first = Database(
+        create_sqlite_connect_string(str(tmp_path / "first.db")), cache=cache
+    )
+    Converter(
+        first,
+        mindata="tests/testdata/min.data",
+        tsdata="tests/testdata/ts.data",
+    ).convert_no_coords()
+    assert first.number_of_minima() == 10
+    version = first.data_version()
+    first.close()
+
+    second = Database(
+        create_sqlite_connect_string(str(tmp_path / "second.db")),
+        cache=cache,
+    )
+    # the same landscape id and data version as in the first database
+    while second.data_version() < version:
+        second.bump_version()
+    assert second.landscape_id == first.landscape_id
+    assert second.number_of_minima() == 0
+    second.close()
@@ -1,3 +1,5 @@
+import pytest
+
 from viewland.utils import Converter
 from viewland.storage import Database
 from viewland.storage.database import create_connect_string
@@ -18,3 +20,161 @@ def test_converter():
         db.number_of_minima() == 10 and db.number_of_transition_states() == 105
     )
     db.close()
+
+
+def test_converter_incremental(tmp_path):
+    """
+    Test if lines appended to min.data and ts.data are imported on top of
+    a previous import.
+    """
+    with open("tests/testdata/min.data") as f:
+        min_lines = f.readlines()
+    with open("tests/testdata/ts.data") as f:
+        ts_lines = f.readlines()
+    mindata = tmp_path / "min.data"
+    tsdata = tmp_path / "ts.data"
+    mindata.write_text("".join(min_lines[:6]))
+    tsdata.write_text("".join(ts_lines[:2]))
+
+    db = Database(create_connect_string())
+    Converter(db, mindata=str(mindata), tsdata=str(tsdata)).convert_no_coords()
+    db.close()
+
+    mindata.write_text("".join(min_lines))
+    tsdata.write_text("".join(ts_lines))
+    db = Database(create_connect_string())
+    Converter(db, mindata=str(mindata), tsdata=str(tsdata)).convert_no_coords(
+        incremental=True
+    )
+    assert (
+        db.number_of_minima() == 10 and db.number_of_transition_states() == 105
+    )
+    db.close()
+
+
+def test_converter_is_up_to_date(tmp_path):
+    """
+    Test if unchanged files are recognised and modified files are not.
+    """
+    mindata = tmp_path / "min.data"
+    tsdata = tmp_path / "ts.data"
+    with open("tests/testdata/min.data") as f:
+        mindata.write_text(f.read())
+    with open("tests/testdata/ts.data") as f:
+        tsdata.write_text(f.read())
+
+    db = Database(create_connect_string(), reset=True)
+    converter = Converter(db, mindata=str(mindata), tsdata=str(tsdata))
+    assert not converter.is_up_to_date()
+    converter.convert_no_coords()
+    assert converter.is_up_to_date()
+
+    with open(str(tsdata), "a") as f:
+        f.write(" 1.0 1.0 1 1 2 1.0 1.0 1.0\n")
+    assert not converter.is_up_to_date()
+    db.close()
+
+
+def test_converter_statistics():
+    """
+    Test if the statistics stored at import agree with the imported data.
+    """
+    db = Database(create_connect_string(), reset=True)
+    assert db.get_statistics() is None
+    Converter(
+        db, mindata="tests/testdata/min.data", tsdata="tests/testdata/ts.data"
+    ).convert_no_coords()
+    db.session.expunge_all()
+    statistics = db.get_statistics()
+    minima = db.minima_arrays()
+    transition_states = db.transition_state_arrays()
+    assert statistics.nminima == 10
+    assert statistics.ntransition_states == 105
+    assert statistics.global_minimum_id == db.get_lowest_energy_minimum().id()
+    assert statistics.ts_energy_min == transition_states["energy"].min()
+    assert statistics.ts_energy_max == transition_states["energy"].max()
+    assert statistics.minimum_energy_max == minima["energy"].max()
+    assert statistics.ts_energy_histogram.sum() == 105
+    db.reset()
+    assert db.get_statistics() is None
+    db.close()
+
+
+def test_converter_failed_import(tmp_path):
+    """
+    Test if the batches written before an invalid line are removed again.
+    """
+    with open("tests/testdata/min.data") as f:
+        min_lines = f.readlines()
+    mindata = tmp_path / "min.data"
+    mindata.write_text("".join(min_lines[:6]) + " nan 1.0 1 1.0 1.0 1.0\n")
+
+    db = Database(create_connect_string())
+    converter = Converter(
+        db, mindata=str(mindata), tsdata="tests/testdata/ts.data", batch_size=2
+    )
+    with pytest.raises(ValueError):
+        converter.convert_no_coords()
+    assert db.number_of_minima() == 0
+    db.close()
+
+
+@pytest.mark.parametrize("nprocs", [None, 2])
+def test_converter_empty_line(tmp_path, nprocs):
+    """
+    Test if an empty line in min.data, which would shift the ids of the
+    following minima, is reported with its line number.
+    """
+    with open("tests/testdata/min.data") as f:
+        min_lines = f.readlines()
+    mindata = tmp_path / "min.data"
+    mindata.write_text("".join(min_lines[:3] + ["\n"] + min_lines[4:]))
+
+    db = Database(create_connect_string(), reset=True)
+    converter = Converter(
+        db,
+        mindata=str(mindata),
+        tsdata="tests/testdata/ts.data",
+        batch_size=2,
+        nprocs=nprocs,
+    )
+    with pytest.raises(ValueError, match="empty line 4"):
+        converter.convert_no_coords()
+    assert db.number_of_minima() == 0
+    db.close()
+
+
+@pytest.mark.parametrize("nprocs", [None, 2])
+def test_converter_incomplete_line(tmp_path, nprocs):
+    """
+    Test if a last line which is still being written is left for the next
+    incremental import.
+    """
+    with open("tests/testdata/min.data") as f:
+        min_lines = f.readlines()
+    with open("tests/testdata/ts.data") as f:
+        ts_lines = f.readlines()
+    mindata = tmp_path / "min.data"
+    tsdata = tmp_path / "ts.data"
+    half = len(min_lines[6]) // 2
+    mindata.write_text("".join(min_lines[:6]) + min_lines[6][:half])
+    tsdata.write_text("".join(ts_lines[:2]))
+
+    db = Database(create_connect_string())
+    converter = Converter(
+        db, mindata=str(mindata), tsdata=str(tsdata), nprocs=nprocs
+    )
+    converter.convert_no_coords()
+    assert db.number_of_minima() == 6
+    assert not converter.is_up_to_date()
+
+    mindata.write_text("".join(min_lines))
+    tsdata.write_text("".join(ts_lines))
+    converter.convert_no_coords(incremental=True)
+    assert (
+        db.number_of_minima() == 10 and db.number_of_transition_states() == 105
+    )
+    energies = [float(line.split()[0]) for line in min_lines]
+    assert db.minima_arrays()["energy"].tolist() == energies
+    assert converter.is_up_to_date()
+    db.close()
@@ -0,0 +1,23 @@
+from viewland.storage.coords import CoordinateStore
+
+import numpy as np
+import pytest
+
+
+def test_coordinate_store(tmp_path):
+    """Test if records are mapped to ids starting from 1."""
+    path = tmp_path / "points.min"
+    np.arange(3 * 6, dtype=np.float64).tofile(str(path))
+    store = CoordinateStore(str(path), natoms=2)
+    assert len(store) == 3
+    assert store[2].tolist() == [6.0, 7.0, 8.0, 9.0, 10.0, 11.0]
+    with pytest.raises(KeyError):
+        store[4]
+
+
+def test_coordinate_store_wrong_natoms(tmp_path):
+    """Test if a file which does not match natoms is rejected."""
+    path = tmp_path / "points.min"
+    np.arange(3 * 6, dtype=np.float64).tofile(str(path))
+    with pytest.raises(ValueError):
+        CoordinateStore(str(path), natoms=4)
@@ -0,0 +1,294 @@
+from viewland.utils import DisconnectivityGraph, LandscapeGraph
+from viewland.utils.graph_backends import (
+    ArrayGraph,
+    NetworkxGraph,
+    make_graph_backend,
+)
+from viewland.utils.pathsample import read_min_data, read_ts_data
+
+import numpy as np
+import pytest
+import sys
+
+
+def _landscape_graph(nmin=300, nts=280, seed=0):
+    """Return a random LandscapeGraph with many connected components."""
+    rng = np.random.default_rng(seed)
+    minima = dict(
+        id=np.arange(1, nmin + 1),
+        energy=rng.normal(0.0, 1.0, nmin),
+        fvib=np.ones(nmin),
+        pgorder=np.ones(nmin, dtype=int),
+    )
+    transition_states = dict(
+        id=np.arange(1, nts + 1),
+        energy=rng.normal(5.0, 1.0, nts),
+        fvib=np.ones(nts),
+        pgorder=np.ones(nts, dtype=int),
+        min1=rng.integers(1, nmin + 1, nts),
+        min2=rng.integers(1, nmin + 1, nts),
+    )
+    return LandscapeGraph.from_arrays(minima, transition_states)
+
+
+def _ids(graph, indices):
+    return sorted(m.id() for m in graph.nodes(indices))
+
+
+@pytest.mark.parametrize("scipy", [True, False])
+def test_backends_agree(scipy, monkeypatch):
+    """
+    Test if the array backend, with and without scipy, agrees with the
+    networkx backend.
+    """
+    if not scipy:
+        monkeypatch.setitem(sys.modules, "scipy.sparse", None)
+    landscape = _landscape_graph()
+    arrays = ArrayGraph(landscape)
+    reference = NetworkxGraph(landscape.to_networkx())
+
+    for graph in [arrays, reference]:
+        assert graph.number_of_nodes() == 300
+        assert graph.number_of_edges() == landscape.number_of_edges()
+    components = [
+        sorted(_ids(graph, c) for c in graph.connected_components())
+        for graph in [arrays, reference]
+    ]
+    assert components[0] == components[1]
+
+    minimum = reference.nodes([7])[0]
+    assert _ids(
+        arrays, arrays.node_connected_component(arrays.index(minimum))
+    ) == _ids(reference, reference.node_connected_component(7))
+
+    degrees = []
+    for graph in [arrays, reference]:
+        by_id = {m.id(): d for m, d in zip(graph.nodes(), graph.degrees())}
+        degrees.append(by_id)
+    assert degrees[0] == degrees[1]
+
+    subgraphs = [
+        g.remove_nodes(np.arange(0, g.number_of_nodes(), 2))
+        for g in [arrays, reference]
+    ]
+    assert _ids(subgraphs[0], None) == _ids(subgraphs[1], None)
+    assert sorted(ts.id() for ts in subgraphs[0].transition_states()) == (
+        sorted(ts.id() for ts in subgraphs[1].transition_states())
+    )
+
+
+def test_disconnectivity_graph_backends():
+    """
+    Test if the disconnectivity graph does not depend on the backend.
+    """
+    minima = read_min_data("tests/testdata/min.data")
+    transition_states = read_ts_data("tests/testdata/ts.data")
+    landscape = LandscapeGraph.from_arrays(
+        dict(
+            id=np.arange(1, len(minima) + 1),
+            **{name: minima[name] for name in ["energy", "fvib", "pgorder"]}
+        ),
+        dict(
+            id=np.arange(1, len(transition_states) + 1),
+            **{
+                name: transition_states[name]
+                for name in ["energy", "fvib", "pgorder", "min1", "min2"]
+            }
+        ),
+    )
+    layouts = []
+    for backend in ["networkx", "arrays"]:
+        dg = DisconnectivityGraph(landscape, nlevels=8, backend=backend)
+        dg.calculate()
+        xpos, layout_minima = dg.get_minima_layout()
+        layouts.append([(m.id(), x) for x, m in zip(xpos, layout_minima)])
+    assert layouts[0] == layouts[1]
+
+
+def test_disconnectivity_graph_statistics():
+    """
+    Test if the energy levels do not depend on whether the statistics of 
+    the landscape are given, for a graph which is the whole landscape and
+    for one with duplicate transition states and many components.
+    """
+    from viewland.storage import LandscapeStatistics
+    from viewland.utils.statistics import landscape_statistics
+
+    nmin, nts = 50, 40
+    rng = np.random.default_rng(2)
+    minima = dict(
+        id=np.arange(1, nmin + 1),
+        energy=rng.normal(0.0, 1.0, nmin),
+        fvib=np.ones(nmin),
+        pgorder=np.ones(nmin, dtype=int),
+    )
+    # a chain through all minima, without duplicates or self-connections
+    chain = dict(
+        id=np.arange(1, nmin),
+        energy=rng.normal(5.0, 1.0, nmin - 1),
+        fvib=np.ones(nmin - 1),
+        pgorder=np.ones(nmin - 1, dtype=int),
+        min1=np.arange(1, nmin),
+        min2=np.arange(2, nmin + 1),
+    )
+    random = dict(
+        id=np.arange(1, nts + 1),
+        energy=rng.normal(5.0, 1.0, nts),
+        fvib=np.ones(nts),
+        pgorder=np.ones(nts, dtype=int),
+        min1=rng.integers(1, 10, nts),
+        min2=rng.integers(1, 10, nts),
+    )
+    for transition_states in [chain, random]:
+        landscape = LandscapeGraph.from_arrays(minima, transition_states)
+        statistics = LandscapeStatistics(
+            1, **landscape_statistics(minima, transition_states)
+        )
+        levels = []
+        for s in [None, statistics]:
+            dg = DisconnectivityGraph(landscape, nlevels=6, statistics=s)
+            dg.calculate()
+            levels.append(dg.energy_levels)
+        assert levels[0] == levels[1]
+
+
+def test_make_graph_backend():
+    """Test the choice of the backend."""
+    small = _landscape_graph(nmin=10, nts=20)
+    assert isinstance(make_graph_backend(small), NetworkxGraph)
+    assert isinstance(make_graph_backend(small, "arrays"), ArrayGraph)
+    with pytest.raises(ValueError):
+        make_graph_backend(small.to_networkx(), "arrays")
+    with pytest.raises(ValueError):
+        make_graph_backend(small, "igraph")
+
+
+def test_graph_backend_abstract():
+    """Test if an incomplete backend class cannot be instantiated."""
+    from viewland.utils.graph_backends import GraphBackend
+
+    class Incomplete(GraphBackend):
+        def number_of_nodes(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("backend", ["networkx", "arrays"])
+def test_reduce_graph(backend):
+    """
+    Test if the reduced graph holds the component of the global minimum
+    and all components with at least subgraph_size minima.
+    """
+    landscape = _landscape_graph()
+    graph = make_graph_backend(landscape, backend)
+    labels = graph.component_labels()
+    sizes = np.bincount(labels)
+    assert sorted(sizes) == sorted(
+        len(c) for c in graph.connected_components()
+    )
+
+    dg = DisconnectivityGraph(landscape, backend=backend, subgraph_size=5)
+    reduced = dg._reduce_graph(graph, dg.min0list)
+    igmin = graph.index(dg.gmin0)
+    expected = (sizes[labels] >= 5) | (labels == labels[igmin])
+    assert _ids(reduced, None) == _ids(graph, np.flatnonzero(expected))
+
+
+@pytest.mark.parametrize("backend", ["networkx", "arrays"])
+def test_remove_high_energy(backend, capsys):
+    """
+    Test if the energy cutoff removes the minima and transition states
+    above it, and the transition states to removed minima, and if only the
+    transition states between kept minima are counted in the log.
+    """
+    landscape = _landscape_graph()
+    # minima above the cutoff, with edges to them
+    landscape.energy += 4.5
+    graph = make_graph_backend(landscape, backend)
+    dg = DisconnectivityGraph(landscape, backend=backend)
+    emax = 5.0
+    filtered = dg._remove_high_energy(graph, emax)
+    assert (filtered.node_energies() <= emax).all()
+    assert (filtered.edge_energies() <= emax).all()
+    i1, i2 = landscape.edge_min1, landscape.edge_min2
+    expected = (
+        (landscape.ts_energy <= emax)
+        & (landscape.energy[i1] <= emax)
+        & (landscape.energy[i2] <= emax)
+    )
+    assert filtered.number_of_nodes() == (landscape.energy <= emax).sum()
+    assert filtered.number_of_edges() == expected.sum()
+    removed = (
+        (landscape.ts_energy > emax)
+        & (landscape.energy[i1] <= emax)
+        & (landscape.energy[i2] <= emax)
+    )
+    assert 0 < removed.sum() < (landscape.ts_energy > emax).sum()
+    assert "removing %d edges" % removed.sum() in capsys.readouterr().out
+
+
+def test_disconnectivity_graph_from_database():
+    """
+    Test if Emax applied by the database query gives the disconnectivity
+    graph of Emax applied to the whole graph.
+    """
+    from viewland.storage import Database
+    from viewland.storage.database import create_connect_string
+    from viewland.utils import Converter, database2graph
+
+    db = Database(create_connect_string())
+    Converter(
+        db, mindata="tests/testdata/min.data", tsdata="tests/testdata/ts.data"
+    ).convert_no_coords()
+    emax = float(np.quantile(db.transition_state_arrays()["energy"], 0.8))
+    layouts = []
+    for graph in [db, database2graph(db)]:
+        dg = DisconnectivityGraph(graph, nlevels=6, Emax=emax)
+        dg.calculate()
+        xpos, layout_minima = dg.get_minima_layout()
+        layouts.append([(m.id(), x) for x, m in zip(xpos, layout_minima)])
+    assert layouts[0] == layouts[1]
+    db.close()
+
+
+def test_database2graph_self_connected(tmp_path, capsys):
+    """
+    Test if database2graph keeps the lowest self-connected transition
+    state, which sets the lowest default energy level, and if a
+    LandscapeGraph reports the ones it dropped.
+    """
+    import networkx as nx
+    from viewland.storage import Database
+    from viewland.storage.database import create_connect_string
+    from viewland.utils import Converter, database2graph
+
+    mindata = tmp_path / "min.data"
+    tsdata = tmp_path / "ts.data"
+    mindata.write_text(
+        "".join("{} 1.0 1 1.0 1.0 1.0\n".format(e) for e in [0, 1, 2, 3])
+    )
+    tsdata.write_text(
+        "5.0 1.0 1 1 2 1.0 1.0 1.0\n"
+        "6.0 1.0 1 2 3 1.0 1.0 1.0\n"
+        "7.0 1.0 1 3 4 1.0 1.0 1.0\n"
+        "4.0 1.0 1 2 2 1.0 1.0 1.0\n"
+        "3.0 1.0 1 2 2 1.0 1.0 1.0\n"
+    )
+    db = Database(create_connect_string(), reset=True)
+    Converter(db, mindata=str(mindata), tsdata=str(tsdata)).convert_no_coords()
+
+    graph = database2graph(db)
+    loops = list(nx.selfloop_edges(graph, data="ts"))
+    assert len(loops) == 1 and loops[0][2].energy == 3.0
+    dg = DisconnectivityGraph(graph, nlevels=5)
+    dg.calculate()
+    assert dg.energy_levels == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+    capsys.readouterr()
+    dg = DisconnectivityGraph(db, nlevels=3)
+    dg.calculate()
+    assert dg.energy_levels == [5.0, 6.0, 7.0]
+    assert "2 self-connected transition states" in capsys.readouterr().out
+    db.close()
@@ -0,0 +1,115 @@
+from viewland.utils import DisconnectivityGraph, LandscapeGraph
+from viewland.utils import deduplicate_transition_states
+from viewland.utils.pathsample import read_min_data, read_ts_data
+
+import numpy as np
+
+
+def _arrays():
+    minima = dict(
+        id=np.array([3, 1, 2, 4]),
+        energy=np.array([2.0, 0.0, 1.0, 9.0]),
+        fvib=np.ones(4),
+        pgorder=np.ones(4, dtype=int),
+    )
+    transition_states = dict(
+        id=np.arange(1, 7),
+        energy=np.array([5.0, 4.0, 6.0, 4.0, 3.0, 10.0]),
+        fvib=np.ones(6),
+        pgorder=np.ones(6, dtype=int),
+        min1=np.array([1, 2, 2, 3, 3, 4]),
+        min2=np.array([2, 1, 3, 2, 3, 1]),
+    )
+    return minima, transition_states
+
+
+def test_landscape_graph():
+    """
+    Test the CSR adjacency and if the lowest transition state of each pair
+    of minima is kept and self-connected transition states are dropped.
+    """
+    minima, transition_states = _arrays()
+    graph = LandscapeGraph.from_arrays(minima, transition_states)
+    assert graph.ids.tolist() == [1, 2, 3, 4]
+    assert graph.number_of_edges() == 3
+    assert sorted(graph.ts_id.tolist()) == [2, 4, 6]
+    assert (graph.nduplicates, graph.nself_connected) == (2, 1)
+    assert graph.degree().tolist() == [2, 2, 1, 1]
+    assert sorted(graph.ids[graph.neighbors(1)].tolist()) == [1, 3]
+    for i in range(graph.number_of_nodes()):
+        edges = graph.edge_index[graph.indptr[i] : graph.indptr[i + 1]]
+        ends = np.concatenate([graph.edge_min1[edges], graph.edge_min2[edges]])
+        assert (ends == i).reshape(2, -1).any(axis=0).all()
+
+    graph = LandscapeGraph.from_arrays(minima, transition_states, Emax=5.0)
+    assert graph.ids.tolist() == [1, 2, 3]
+    assert sorted(graph.ts_id.tolist()) == [2, 4]
+
+
+def test_landscape_graph_to_networkx():
+    """
+    Test if the networkx graph and the disconnectivity graph agree with
+    those made from a networkx graph.
+    """
+    minima = read_min_data("tests/testdata/min.data")
+    minima = dict(
+        id=np.arange(1, len(minima) + 1),
+        energy=minima["energy"],
+        fvib=minima["fvib"],
+        pgorder=minima["pgorder"],
+    )
+    transition_states = read_ts_data("tests/testdata/ts.data")
+    transition_states = dict(
+        id=np.arange(1, len(transition_states) + 1),
+        **{
+            name: transition_states[name]
+            for name in ["energy", "fvib", "pgorder", "min1", "min2"]
+        }
+    )
+    graph = LandscapeGraph.from_arrays(minima, transition_states)
+    nxgraph = graph.to_networkx()
+    assert nxgraph.number_of_nodes() == graph.number_of_nodes()
+    assert nxgraph.number_of_edges() == graph.number_of_edges()
+    for m1, m2, ts in nxgraph.edges(data="ts"):
+        pair = sorted([m1.id(), m2.id()])
+        candidates = [
+            e
+            for e, a, b in zip(
+                transition_states["energy"],
+                transition_states["min1"],
+                transition_states["min2"],
+            )
+            if sorted([a, b]) == pair
+        ]
+        assert ts.energy == min(candidates)
+
+    layouts = []
+    for g in [graph, nxgraph]:
+        dg = DisconnectivityGraph(g, nlevels=6)
+        dg.calculate()
+        xpos, layout_minima = dg.get_minima_layout()
+        layouts.append([(m.id(), x) for x, m in zip(xpos, layout_minima)])
+    assert layouts[0] == layouts[1]
+
+
+def test_deduplicate_transition_states():
+    """
+    Test if the lowest, and of equal ones the last, transition state of
+    each pair of minima is kept.
+    """
+    keep, nduplicates, nself_connected = deduplicate_transition_states(
+        min1=[1, 2, 1, 3, 2, 5],
+        min2=[2, 1, 2, 3, 4, 4],
+        energy=[1.0, 0.5, 0.5, 0.0, 2.0, 3.0],
+    )
+    assert keep.tolist() == [2, 4, 5]
+    assert (nduplicates, nself_connected) == (2, 1)
+
+    keep, nduplicates, nself_connected = deduplicate_transition_states(
+        min1=[1, 3, 3, 2],
+        min2=[2, 3, 3, 1],
+        energy=[1.0, 0.5, 0.2, 0.5],
+        keep_self_connected=True,
+    )
+    assert keep.tolist() == [3, 2]
+    assert (nduplicates, nself_connected) == (2, 0)
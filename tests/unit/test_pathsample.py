@@ -0,0 +1,88 @@
+from viewland.utils.pathsample import (
+    read_min_data,
+    read_ts_data,
+    iter_min_data,
+    iter_ts_data,
+    split_byte_ranges,
+    ParseError,
+)
+
+import pytest
+
+
+def test_read_min_data():
+    """Test if min.data is parsed into typed columns in file order."""
+    minima = read_min_data("tests/testdata/min.data")
+    assert len(minima) == 10
+    assert minima["energy"][0] == 78.940841426146022
+    assert minima["fvib"][1] == 55.063600230056572
+    assert minima["pgorder"].tolist() == [1] * 10
+
+
+def test_read_ts_data():
+    """Test if ts.data is parsed into typed columns in file order."""
+    transition_states = read_ts_data("tests/testdata/ts.data")
+    assert len(transition_states) == 105
+    assert transition_states["energy"][0] == 78.959195539115683
+    assert transition_states["min1"][0] == 1
+    assert transition_states["min2"][0] == 2
+    assert transition_states["min1"][2] == transition_states["min2"][2] == 2
+
+
+def test_iter_ts_data():
+    """Test if ts.data is split into blocks of at most batch_size lines."""
+    batches = list(iter_ts_data("tests/testdata/ts.data", batch_size=40))
+    assert [len(b) for b in batches] == [40, 40, 25]
+
+
+def test_split_byte_ranges():
+    """Test if the byte ranges are contiguous and end on line boundaries."""
+    path = "tests/testdata/ts.data"
+    ranges = split_byte_ranges(path, chunk_bytes=1000)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (begin, _) in zip(ranges[:-1], ranges[1:]):
+        assert end == begin and data[end - 1 : end] == b"\n"
+
+
+def test_read_ts_data_parallel():
+    """Test if parallel parsing keeps the order of the lines."""
+    serial = read_ts_data("tests/testdata/ts.data")
+    parallel = read_ts_data("tests/testdata/ts.data", nprocs=3)
+    assert (serial == parallel).all()
+
+
+def test_read_compressed_ts_data(tmp_path):
+    """Test if gzip, bz2 and xz compressed files are read transparently."""
+    import bz2
+    import gzip
+    import lzma
+
+    with open("tests/testdata/ts.data", "rb") as f:
+        data = f.read()
+    expected = read_ts_data("tests/testdata/ts.data")
+    for suffix, module in [(".gz", gzip), (".bz2", bz2), (".xz", lzma)]:
+        path = tmp_path / ("ts.data" + suffix)
+        path.write_bytes(module.compress(data))
+        assert (read_ts_data(str(path)) == expected).all()
+        batches = list(iter_ts_data(str(path), batch_size=40))
+        assert sum(len(b) for b in batches) == len(expected)
+
+
+def test_read_min_data_empty_line(tmp_path):
+    """
+    Test if empty and comment lines are rejected with their line number,
+    in all ways of parsing.
+    """
+    with open("tests/testdata/min.data") as f:
+        lines = f.readlines()
+    path = tmp_path / "min.data"
+    for line, message in [("\n", "empty"), ("# comment\n", "comment")]:
+        path.write_text("".join(lines[:7] + [line] + lines[7:]))
+        for nprocs in [None, 3]:
+            with pytest.raises(ParseError) as error:
+                read_min_data(str(path), nprocs=nprocs)
+            assert (error.value.message, error.value.line) == (message, 8)
+        with pytest.raises(ParseError, match="{} line 8".format(message)):
+            list(iter_min_data(str(path), batch_size=3))
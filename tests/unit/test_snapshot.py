@@ -0,0 +1,25 @@
+from viewland.storage import LandscapeSnapshot, write_snapshot
+from viewland.utils import database2graph
+from viewland.utils.pathsample import read_min_data, read_ts_data
+
+
+def test_snapshot(tmp_path):
+    """
+    Test if a snapshot written from min.data and ts.data is read back and
+    can be turned into a graph without a database.
+    """
+    path = str(tmp_path / "landscape")
+    minima = read_min_data("tests/testdata/min.data")
+    transition_states = read_ts_data("tests/testdata/ts.data")
+    write_snapshot(path, minima, transition_states)
+
+    snapshot = LandscapeSnapshot(path)
+    assert snapshot.number_of_minima() == 10
+    assert snapshot.number_of_transition_states() == 105
+    assert snapshot.minima["id"].tolist() == list(range(1, 11))
+    assert (
+        snapshot.transition_states["min2"] == transition_states["min2"]
+    ).all()
+
+    graph = database2graph(snapshot)
+    assert graph.number_of_nodes() == 10
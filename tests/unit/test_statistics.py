@@ -0,0 +1,101 @@
+from viewland.utils.statistics import (
+    connected_components,
+    landscape_statistics,
+    stream_landscape_statistics,
+    QUANTILE_LEVELS,
+)
+
+import networkx as nx
+import numpy as np
+
+
+def test_connected_components():
+    """
+    Test if the components agree with networkx on a random sparse graph.
+    """
+    rng = np.random.default_rng(0)
+    ids = rng.permutation(np.arange(1, 201))
+    min1 = rng.integers(1, 211, 150)
+    min2 = rng.integers(1, 211, 150)
+    labels = connected_components(ids, min1, min2)
+
+    graph = nx.Graph()
+    graph.add_nodes_from(ids.tolist())
+    graph.add_edges_from(
+        (a, b) for a, b in zip(min1, min2) if a <= 200 and b <= 200
+    )
+    index = {m: i for i, m in enumerate(ids.tolist())}
+    expected = np.empty(len(ids), dtype=int)
+    for component in nx.connected_components(graph):
+        positions = [index[m] for m in component]
+        expected[positions] = min(positions)
+    assert np.array_equal(labels, expected)
+
+
+def test_landscape_statistics():
+    """
+    Test the statistics of a small landscape with a self-connected
+    transition state and an isolated minimum.
+    """
+    minima = dict(id=np.array([1, 2, 3, 4]), energy=np.array([3, 1, 2, 5.0]))
+    transition_states = dict(
+        energy=np.array([10.0, 12.0, 11.0]),
+        min1=np.array([1, 2, 3]),
+        min2=np.array([2, 3, 3]),
+    )
+    statistics = landscape_statistics(minima, transition_states, nbins=2)
+    assert statistics["nminima"] == 4
+    assert statistics["ntransition_states"] == 3
+    assert statistics["global_minimum_id"] == 2
+    assert statistics["minimum_energy_min"] == 1.0
+    assert statistics["ts_energy_max"] == 12.0
+    assert statistics["nself_connected"] == 1
+    assert statistics["ncomponents"] == 2
+    assert list(statistics["ts_energy_histogram"]) == [1, 2]
+
+    empty = landscape_statistics(
+        dict(id=[], energy=[]), dict(energy=[], min1=[], min2=[])
+    )
+    assert empty["nminima"] == 0 and empty["ts_energy_min"] is None
+
+
+def test_stream_landscape_statistics():
+    """
+    Test if statistics from blocks in energy order agree with those of the
+    whole arrays.
+    """
+    rng = np.random.default_rng(1)
+    minima = dict(id=np.arange(1, 101), energy=rng.normal(0.0, 1.0, 100))
+    transition_states = dict(
+        energy=rng.normal(5.0, 1.0, 150),
+        min1=rng.integers(1, 101, 150),
+        min2=rng.integers(1, 101, 150),
+    )
+    expected = landscape_statistics(minima, transition_states)
+
+    order = np.argsort(minima["energy"])
+    ts_order = np.argsort(transition_states["energy"])
+    statistics = stream_landscape_statistics(
+        [
+            {name: value[order][i : i + 7] for name, value in minima.items()}
+            for i in range(0, 100, 7)
+        ],
+        [
+            {
+                name: value[ts_order][i : i + 13]
+                for name, value in transition_states.items()
+            }
+            for i in range(0, 150, 13)
+        ],
+        150,
+        ts_energy_range=(
+            transition_states["energy"].min(),
+            transition_states["energy"].max(),
+        ),
+    )
+    for name, value in expected.items():
+        assert np.array_equal(statistics[name], value), name
+    assert np.array_equal(
+        statistics["ts_energy_quantiles"],
+        np.quantile(transition_states["energy"], QUANTILE_LEVELS),
+    )
@@ -0,0 +1,24 @@
+from viewland.storage.types import encode_array, decode_array
+
+import pickle
+import numpy as np
+
+
+def test_encode_decode_array():
+    """Test if arrays keep their values, dtype and shape."""
+    for array in [
+        np.arange(12, dtype=np.float64).reshape(3, 4),
+        np.arange(5, dtype=">i4"),
+        np.zeros(0),
+        np.float64(1.5),
+    ]:
+        decoded = decode_array(encode_array(array))
+        assert decoded.shape == np.shape(array)
+        assert decoded.dtype == np.asarray(array).dtype.newbyteorder("<")
+        assert (decoded == array).all()
+
+
+def test_decode_pickled_array():
+    """Test if values written by PickleType can still be read."""
+    array = np.arange(4.0)
+    assert (decode_array(pickle.dumps(array)) == array).all()